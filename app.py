@@ -9,21 +9,29 @@ import asyncio
 import signal
 import os
 
-from rickbot.main import RickBot
-
 abspath = os.path.abspath(__file__)
 dname = os.path.dirname(abspath)
 os.chdir(dname)
 
-bot = RickBot()
-
 
 async def main():
+    # Imported and built here, not at import time: worker processes (helpers/workers.py) are spawned
+    # and re-import this file, they must not build a bot or set up logging
+    from rickbot.main import RickBot
+    from helpers.config import reload_config
+
+    bot = RickBot()
+
     for s in [signal.SIGTERM, signal.SIGINT]:
         asyncio.get_event_loop().add_signal_handler(
             s, lambda s=s: asyncio.create_task(bot.shutdown(s))
         )
 
+    # Reload the config without restarting
+    asyncio.get_event_loop().add_signal_handler(
+        signal.SIGHUP, lambda: asyncio.create_task(reload_config())
+    )
+
     await bot.start_bot()
 
 
@@ -10,33 +10,27 @@ This cog is for the 5050 command, which allows users to gamble a specified amoun
 # Python Standard Library
 from discord.ext import commands
 import discord
-import logging
 import random
 
-# Third-Party Libraries
-import aiohttp
-
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR
 from helpers.custom.errors import DatabaseImpossibleError
 from helpers.custom.format import format_money
 from helpers.errors import handle_error
 from helpers.logs import RICKLOG_CMDS
+from helpers.ledger import balances
+from helpers.locks import money_lock
 
 # Database
 from helpers.db import money_collection
 
-# Config
-from helpers.config import CUSTOM_CONFIG
-
-RICKLOG = logging.getLogger("rickbot")
-
 
 class Money_5050Command(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @commands.command(name="5050")
+    @money_lock()
     async def _5050(self, ctx: commands.Context, amount: int):
         """
         Gamble a specified amount of money with a 50% chance to double it. Can only be used with money in the wallet.
@@ -74,6 +68,7 @@ class Money_5050Command(commands.Cog):
             return
 
         # Bet is okay so take the money from the wallet
+        bet = amount
         wallet -= amount
 
         # Randomly determine if the user wins
@@ -104,60 +99,45 @@ class Money_5050Command(commands.Cog):
             {"$set": {"wallet": wallet}},
         )
 
+        self.bot.ledger.record(
+            ctx.author.id,
+            "5050_win" if win else "5050_loss",
+            # The net change either way, a win pays out double the bet including the stake
+            bet,
+            before=balances(query or {}),
+            after={"wallet": wallet, "bank": (query or {}).get("bank", 0)},
+        )
+
         # Log this transaction
 
-        try:
-            webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-        except KeyError:
-            RICKLOG.critical(
-                "No webhook URL found for transaction logging. Not logging this transaction."
+        if win:
+            webhook_embed = discord.Embed(
+                title="5050 Win",
+                description=f"{ctx.author.mention} won {format_money(amount)}",
+                color=SUCCESS_EMBED_COLOR,
             )
+
+            webhook_embed.add_field(
+                name="Original Wallet", value=format_money(original_wallet)
+            )
+            webhook_embed.add_field(name="New Wallet", value=format_money(wallet))
+            webhook_embed.add_field(name="Amount Won", value=format_money(amount))
         else:
-            async with aiohttp.ClientSession() as session:
-                webhook: discord.Webhook = discord.Webhook.from_url(
-                    webhook_url, session=session
-                )
-
-                if win:
-                    webhook_embed = discord.Embed(
-                        title="5050 Win",
-                        description=f"{ctx.author.mention} won {format_money(amount)}",
-                        color=SUCCESS_EMBED_COLOR,
-                    )
-
-                    webhook_embed.add_field(
-                        name="Original Wallet", value=format_money(original_wallet)
-                    )
-                    webhook_embed.add_field(
-                        name="New Wallet", value=format_money(wallet)
-                    )
-                    webhook_embed.add_field(
-                        name="Amount Won", value=format_money(amount)
-                    )
-                else:
-                    webhook_embed = discord.Embed(
-                        title="5050 Loss",
-                        description=f"{ctx.author.mention} lost {format_money(amount)}",
-                        color=ERROR_EMBED_COLOR,
-                    )
-
-                    webhook_embed.add_field(
-                        name="Original Wallet", value=format_money(original_wallet)
-                    )
-                    webhook_embed.add_field(
-                        name="New Wallet", value=format_money(wallet)
-                    )
-                    webhook_embed.add_field(
-                        name="Amount Lost", value=format_money(amount)
-                    )
-
-                    webhook_embed.set_footer(text="Better Hood Money")
-
-                await webhook.send(
-                    username="Better Hood Money Transactions",
-                    avatar_url=self.bot.user.avatar.url,
-                    embed=webhook_embed,
-                )
+            webhook_embed = discord.Embed(
+                title="5050 Loss",
+                description=f"{ctx.author.mention} lost {format_money(amount)}",
+                color=ERROR_EMBED_COLOR,
+            )
+
+            webhook_embed.add_field(
+                name="Original Wallet", value=format_money(original_wallet)
+            )
+            webhook_embed.add_field(name="New Wallet", value=format_money(wallet))
+            webhook_embed.add_field(name="Amount Lost", value=format_money(amount))
+
+            webhook_embed.set_footer(text="Better Hood Money")
+
+        self.bot.transaction_log.enqueue(webhook_embed)
 
         await ctx.message.reply(embed=embed, mention_author=False)
 
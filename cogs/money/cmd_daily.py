@@ -9,9 +9,7 @@ This cog is for the daily command, which grants a daily reward to users.
 import datetime
 
 # Third-party libraries
-from discord_timestamps import format_timestamp, TimestampType
 from discord.ext import commands
-import aiohttp
 import discord
 
 # Import database
@@ -19,11 +17,11 @@ from helpers.db import money_collection
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR
+from helpers.cooldowns import persistent_cooldown
 from helpers.custom.format import format_money
-from helpers.logs import RICKLOG
-
-# Config
-from helpers.config import CUSTOM_CONFIG
+from helpers.errors import handle_error
+from helpers.ledger import balances
+from helpers.locks import money_lock
 
 
 class Money_DailyCommand(commands.Cog):
@@ -33,38 +31,16 @@ class Money_DailyCommand(commands.Cog):
         self.bot = bot
 
         self.daily_reward_amount = 10000
-        self.daily_reward_cooldown = 86400
 
     @commands.command(name="daily")
+    @persistent_cooldown("daily", 86400)
+    @money_lock()
     async def _daily(self, ctx: commands.Context):
         """Grants a daily monetary reward to the user."""
 
         query = money_collection.find_one({"uid": ctx.author.id})
         user = query if query else {}
 
-        if "data" in user and "last_daily" in user["data"]:
-            if (
-                datetime.datetime.now() - user["data"]["last_daily"]
-            ).total_seconds() < self.daily_reward_cooldown:
-                expires = user["data"]["last_daily"] + datetime.timedelta(
-                    seconds=self.daily_reward_cooldown
-                )
-                timestamp = format_timestamp(expires, TimestampType.RELATIVE)
-
-                embed = discord.Embed(
-                    title="Error",
-                    description=f"You have already claimed your daily reward today. Try again {timestamp}.",
-                    color=ERROR_EMBED_COLOR,
-                )
-                embed.set_footer(text="Better Hood Money")
-                await ctx.message.reply(embed=embed, mention_author=False)
-                return
-        else:
-            money_collection.update_one(
-                {"uid": ctx.author.id},
-                {"$set": {"data": {"last_daily": datetime.datetime.now()}}},
-            )
-
         # Add money to user's bank
         money_collection.update_one(
             {"uid": ctx.author.id},
@@ -72,41 +48,34 @@ class Money_DailyCommand(commands.Cog):
             upsert=True,
         )
 
-        try:
-            webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-        except KeyError:
-            RICKLOG.critical(
-                "No webhook URL found for transaction logging. Not logging this transaction."
-            )
-        else:
-            async with aiohttp.ClientSession() as session:
-                webhook: discord.Webhook = discord.Webhook.from_url(
-                    webhook_url, session=session
-                )
-
-                webhook_embed = discord.Embed(
-                    title="Daily Reward",
-                    description=f"{ctx.author.mention} has been rewarded {format_money(self.daily_reward_amount)}",
-                    color=ERROR_EMBED_COLOR,
-                )
-
-                webhook_embed.add_field(
-                    name="Original Wallet", value=format_money(user.get("wallet", 0))
-                )
-                webhook_embed.add_field(
-                    name="New Wallet",
-                    value=format_money(
-                        user.get("wallet", 0) + self.daily_reward_amount
-                    ),
-                )
-
-                webhook_embed.set_footer(text="Better Hood Money")
-
-                await webhook.send(
-                    username="Better Hood Money Transactions",
-                    avatar_url=self.bot.user.avatar.url,
-                    embed=webhook_embed,
-                )
+        self.bot.ledger.record(
+            ctx.author.id,
+            "daily",
+            self.daily_reward_amount,
+            before=balances(user),
+            after={
+                "wallet": user.get("wallet", 0),
+                "bank": user.get("bank", 0) + self.daily_reward_amount,
+            },
+        )
+
+        webhook_embed = discord.Embed(
+            title="Daily Reward",
+            description=f"{ctx.author.mention} has been rewarded {format_money(self.daily_reward_amount)}",
+            color=ERROR_EMBED_COLOR,
+        )
+
+        webhook_embed.add_field(
+            name="Original Wallet", value=format_money(user.get("wallet", 0))
+        )
+        webhook_embed.add_field(
+            name="New Wallet",
+            value=format_money(user.get("wallet", 0) + self.daily_reward_amount),
+        )
+
+        webhook_embed.set_footer(text="Better Hood Money")
+
+        self.bot.transaction_log.enqueue(webhook_embed)
 
         embed = discord.Embed(
             title="Daily Reward",
@@ -118,6 +87,31 @@ class Money_DailyCommand(commands.Cog):
 
         await ctx.message.reply(embed=embed, mention_author=False)
 
+    @_daily.error
+    async def _daily_error(self, ctx: commands.Context, error):
+        if isinstance(error, commands.CommandOnCooldown):
+            expires = datetime.datetime.now() + datetime.timedelta(
+                seconds=error.retry_after
+            )
+            # Imported on first use, only needed when the reward is on cooldown
+            from discord_timestamps import format_timestamp, TimestampType
+
+            timestamp = format_timestamp(expires, TimestampType.RELATIVE)
+
+            embed = discord.Embed(
+                title="Error",
+                description=f"You have already claimed your daily reward today. Try again {timestamp}.",
+                color=ERROR_EMBED_COLOR,
+            )
+            embed.set_footer(text="Better Hood Money")
+            await ctx.message.reply(embed=embed, mention_author=False)
+
+        else:
+            # Because the error is raised, we can clear the user's cooldown
+            ctx.command.reset_cooldown(ctx)
+
+            await handle_error(ctx, error)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Money_DailyCommand(bot))
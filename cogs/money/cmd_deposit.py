@@ -7,21 +7,18 @@ This cog is for the deposit command, which allows users to deposit money into th
 
 # Third-party libraries
 from discord.ext import commands
-import aiohttp
 import discord
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR
 from helpers.custom.format import format_money
 from helpers.errors import handle_error
-from helpers.logs import RICKLOG
+from helpers.ledger import balances
+from helpers.locks import money_lock
 
 # Database
 from helpers.db import money_collection
 
-# Config
-from helpers.config import CUSTOM_CONFIG
-
 
 class Money_DepositCommand(commands.Cog):
     """A cog for handling the deposit command in a Discord bot."""
@@ -30,6 +27,7 @@ class Money_DepositCommand(commands.Cog):
         self.bot = bot
 
     @commands.command(name="deposit", aliases=["dep"])
+    @money_lock()
     async def _deposit(self, ctx: commands.Context, amount: int):
         """Deposits money from the wallet to the bank."""
         if amount < 1:
@@ -61,46 +59,41 @@ class Money_DepositCommand(commands.Cog):
             upsert=True,
         )
 
-        try:
-            webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-        except KeyError:
-            RICKLOG.critical(
-                "No webhook URL found for transaction logging. Not logging this transaction."
-            )
-        else:
-            async with aiohttp.ClientSession() as session:
-                webhook: discord.Webhook = discord.Webhook.from_url(
-                    webhook_url, session=session
-                )
-
-                webhook_embed = discord.Embed(
-                    title="Deposit",
-                    description=f"{ctx.author.mention} deposited {format_money(amount)} into their bank.",
-                    color=ERROR_EMBED_COLOR,
-                )
-
-                webhook_embed.add_field(
-                    name="Original Wallet", value=format_money(user.get("wallet", 0))
-                )
-                webhook_embed.add_field(
-                    name="New Wallet",
-                    value=format_money(user.get("wallet", 0) - amount),
-                )
-
-                webhook_embed.add_field(
-                    name="Original Bank", value=format_money(user.get("bank", 0))
-                )
-                webhook_embed.add_field(
-                    name="New Bank", value=format_money(user.get("bank", 0) + amount)
-                )
-
-                webhook_embed.set_footer(text="Better Hood Money")
-
-                await webhook.send(
-                    username="Better Hood Money Transactions",
-                    avatar_url=self.bot.user.avatar.url,
-                    embed=webhook_embed,
-                )
+        self.bot.ledger.record(
+            ctx.author.id,
+            "deposit",
+            amount,
+            before=balances(user),
+            after={
+                "wallet": user.get("wallet", 0) - amount,
+                "bank": user.get("bank", 0) + amount,
+            },
+        )
+
+        webhook_embed = discord.Embed(
+            title="Deposit",
+            description=f"{ctx.author.mention} deposited {format_money(amount)} into their bank.",
+            color=ERROR_EMBED_COLOR,
+        )
+
+        webhook_embed.add_field(
+            name="Original Wallet", value=format_money(user.get("wallet", 0))
+        )
+        webhook_embed.add_field(
+            name="New Wallet",
+            value=format_money(user.get("wallet", 0) - amount),
+        )
+
+        webhook_embed.add_field(
+            name="Original Bank", value=format_money(user.get("bank", 0))
+        )
+        webhook_embed.add_field(
+            name="New Bank", value=format_money(user.get("bank", 0) + amount)
+        )
+
+        webhook_embed.set_footer(text="Better Hood Money")
+
+        self.bot.transaction_log.enqueue(webhook_embed)
 
         embed = discord.Embed(
             title="Success",
@@ -7,28 +7,27 @@ This cog is for the give command, which allows users to give money to another us
 
 # Third-party libraries
 from discord.ext import commands
-import aiohttp
 import discord
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR
 from helpers.custom.format import format_money, format_time
+from helpers.cooldowns import persistent_cooldown
 from helpers.errors import handle_error
-from helpers.logs import RICKLOG
+from helpers.ledger import balances
+from helpers.locks import money_lock
 
 # Database
 from helpers.db import money_collection
 
-# Config
-from helpers.config import CUSTOM_CONFIG
-
 
 class Money_GiveCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @commands.command(name="give", aliases=["pay"])
-    @commands.cooldown(1, 60, commands.BucketType.user)
+    @persistent_cooldown("give", 60)
+    @money_lock(lambda ctx, member, amount: member.id)
     async def _give(self, ctx: commands.Context, member: discord.Member, amount: int):
         """Allows a user to give money to another user. The give command is wallet to wallet."""
         if amount < 1 or amount > 1000:
@@ -70,51 +69,58 @@ class Money_GiveCommand(commands.Cog):
             upsert=True,
         )
 
-        try:
-            webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-        except KeyError:
-            RICKLOG.critical(
-                "No webhook URL found for transaction logging. Not logging this transaction."
-            )
-        else:
-            async with aiohttp.ClientSession() as session:
-                webhook: discord.Webhook = discord.Webhook.from_url(
-                    webhook_url, session=session
-                )
-
-                webhook_embed = discord.Embed(
-                    title="Wallet Transaction",
-                    description=f"{ctx.author.mention} has given {member.mention} {format_money(amount)}.",
-                    color=ERROR_EMBED_COLOR,
-                )
-
-                webhook_embed.add_field(
-                    name="Sender's Original Wallet",
-                    value=format_money(user.get("wallet", 0)),
-                )
-
-                webhook_embed.add_field(
-                    name="Sender's New Wallet",
-                    value=format_money(user.get("wallet", 0) - amount),
-                )
-
-                webhook_embed.add_field(
-                    name="Reciever's Original Wallet",
-                    value=format_money(recieveing_user.get("wallet", 0)),
-                )
-
-                webhook_embed.add_field(
-                    name="Reciever's New Wallet",
-                    value=format_money(recieveing_user.get("wallet", 0) + amount),
-                )
-
-                webhook_embed.set_footer(text="Better Hood Money")
-
-                await webhook.send(
-                    username="Better Hood Money Transactions",
-                    avatar_url=self.bot.user.avatar.url,
-                    embed=webhook_embed,
-                )
+        self.bot.ledger.record(
+            ctx.author.id,
+            "give",
+            amount,
+            before=balances(user),
+            after={
+                "wallet": user.get("wallet", 0) - amount,
+                "bank": user.get("bank", 0),
+            },
+            counterparty=member.id,
+        )
+        self.bot.ledger.record(
+            member.id,
+            "give",
+            amount,
+            before=balances(recieveing_user),
+            after={
+                "wallet": recieveing_user.get("wallet", 0) + amount,
+                "bank": recieveing_user.get("bank", 0),
+            },
+            counterparty=ctx.author.id,
+        )
+
+        webhook_embed = discord.Embed(
+            title="Wallet Transaction",
+            description=f"{ctx.author.mention} has given {member.mention} {format_money(amount)}.",
+            color=ERROR_EMBED_COLOR,
+        )
+
+        webhook_embed.add_field(
+            name="Sender's Original Wallet",
+            value=format_money(user.get("wallet", 0)),
+        )
+
+        webhook_embed.add_field(
+            name="Sender's New Wallet",
+            value=format_money(user.get("wallet", 0) - amount),
+        )
+
+        webhook_embed.add_field(
+            name="Reciever's Original Wallet",
+            value=format_money(recieveing_user.get("wallet", 0)),
+        )
+
+        webhook_embed.add_field(
+            name="Reciever's New Wallet",
+            value=format_money(recieveing_user.get("wallet", 0) + amount),
+        )
+
+        webhook_embed.set_footer(text="Better Hood Money")
+
+        self.bot.transaction_log.enqueue(webhook_embed)
 
         embed = discord.Embed(
             title="Success",
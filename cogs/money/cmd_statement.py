@@ -0,0 +1,185 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This cog is for the statement command, which allows users to page through their transaction history.
+"""
+
+# Python standard library
+from datetime import timezone
+from typing import Union
+
+# Third-party libraries
+from discord.ext import commands
+from discord import ui
+from pymongo import DESCENDING
+import discord
+
+# Helper functions
+from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
+from helpers.custom.format import format_money
+from helpers.errors import handle_error
+
+# Database
+from helpers.db import ledger_collection
+
+# Constants
+
+STATEMENT_PAGE_SIZE = 10
+
+TRANSACTION_NAMES = {
+    "daily": "Daily Reward",
+    "deposit": "Deposit",
+    "withdraw": "Withdrawal",
+    "give": "Wallet Transaction",
+    "transfer": "Bank Transfer",
+    "5050_win": "5050 Win",
+    "5050_loss": "5050 Loss",
+    "interest": "Bank Interest",
+}
+
+
+def fetch_statement_page(uid: int, after: tuple | None = None) -> list:
+    """
+    Fetch one page of ledger records for a user, newest first.
+
+    Uses keyset pagination, after is the (ts, _id) of the last record on the previous page.
+    """
+
+    query = {"uid": uid}
+
+    if after is not None:
+        ts, _id = after
+        query["$or"] = [{"ts": {"$lt": ts}}, {"ts": ts, "_id": {"$lt": _id}}]
+
+    return list(
+        ledger_collection.find(query)
+        .sort([("ts", DESCENDING), ("_id", DESCENDING)])
+        .limit(STATEMENT_PAGE_SIZE)
+    )
+
+
+class StatementView(ui.View):
+    def __init__(self, author: discord.abc.User, member: discord.abc.User, page: list):
+        super().__init__(timeout=120)
+
+        self.author = author
+        self.member = member
+        self.page = page
+
+        # The key each page we've already seen started after, so we can go back
+        self.page_keys: list = [None]
+
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.newer.disabled = len(self.page_keys) <= 1
+        self.older.disabled = len(self.page) < STATEMENT_PAGE_SIZE
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{self.member}'s statement",
+            color=MAIN_EMBED_COLOR,
+        )
+
+        for record in self.page:
+            ts = record["ts"].replace(tzinfo=timezone.utc)
+            name = TRANSACTION_NAMES.get(record["type"], record["type"])
+
+            value = (
+                f"{format_money(record['amount'])} - {discord.utils.format_dt(ts, 'R')}\n"
+                f"Wallet: {format_money(record['before']['wallet'])} → {format_money(record['after']['wallet'])}\n"
+                f"Bank: {format_money(record['before']['bank'])} → {format_money(record['after']['bank'])}"
+            )
+
+            if record.get("counterparty"):
+                value += f"\nWith: <@{record['counterparty']}>"
+
+            embed.add_field(name=name, value=value, inline=False)
+
+        embed.set_footer(text=f"Better Hood Money | Page {len(self.page_keys)}")
+
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author.id
+
+    async def show(self, interaction: discord.Interaction, key):
+        self.page = fetch_statement_page(self.member.id, key)
+        self.update_buttons()
+
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @ui.button(label="Newer", style=discord.ButtonStyle.grey)
+    async def newer(self, interaction: discord.Interaction, button: ui.Button):
+        self.page_keys.pop()
+        await self.show(interaction, self.page_keys[-1])
+
+    @ui.button(label="Older", style=discord.ButtonStyle.grey)
+    async def older(self, interaction: discord.Interaction, button: ui.Button):
+        last = self.page[-1]
+        self.page_keys.append((last["ts"], last["_id"]))
+        await self.show(interaction, self.page_keys[-1])
+
+
+class Money_StatementCommand(commands.Cog):
+    """A cog for handling the statement command in a Discord bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="statement", aliases=["transactions"])
+    async def _statement(
+        self,
+        ctx: commands.Context,
+        member: Union[discord.Member, discord.User, None] = None,
+    ):
+        """
+        Shows the transaction history of the specified user, or the calling user if none specified.
+        """
+
+        member = member or ctx.author
+
+        # Make sure the latest transactions are in the database
+        await self.bot.ledger.flush()
+
+        page = fetch_statement_page(member.id)
+
+        if not page:
+            embed = discord.Embed(
+                title=f"{member}'s statement",
+                description="No transactions found.",
+                color=MAIN_EMBED_COLOR,
+            )
+            embed.set_footer(text="Better Hood Money")
+
+            await ctx.message.reply(embed=embed, mention_author=False)
+            return
+
+        view = StatementView(ctx.author, member, page)
+        await ctx.message.reply(
+            embed=view.build_embed(), view=view, mention_author=False
+        )
+
+    @_statement.error
+    async def _statement_error(self, ctx: commands.Context, error):
+        if isinstance(error, commands.BadUnionArgument):
+            embed = discord.Embed(
+                title="Invalid Usage",
+                description="Please enter a valid user.",
+                color=ERROR_EMBED_COLOR,
+            )
+
+            embed.add_field(
+                name="Usage", value=f"```{ctx.prefix}statement [@user]```", inline=False
+            )
+            embed.set_footer(text="Better Hood Money")
+
+            await ctx.message.reply(embed=embed, mention_author=False)
+
+        else:
+            await handle_error(ctx, error)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Money_StatementCommand(bot))
@@ -10,21 +10,19 @@ import asyncio
 
 # Third-party libraries
 from discord.ext import commands
-import aiohttp
 import discord
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR, MAIN_EMBED_COLOR
 from helpers.custom.format import format_money, format_time
+from helpers.cooldowns import persistent_cooldown
 from helpers.errors import handle_error
-from helpers.logs import RICKLOG
+from helpers.ledger import balances
+from helpers.locks import MONEY_LOCKS
 
 # Database
 from helpers.db import money_collection
 
-# Config
-from helpers.config import CUSTOM_CONFIG
-
 
 class Money_TransferCommand(commands.Cog):
     """A cog for handling the transfer command in a Discord bot."""
@@ -33,7 +31,7 @@ class Money_TransferCommand(commands.Cog):
         self.bot = bot
 
     @commands.command(name="transfer", aliases=["send"])
-    @commands.cooldown(1, 300, commands.BucketType.user)
+    @persistent_cooldown("transfer", 300)
     async def _transfer(
         self, ctx: commands.Context, member: discord.Member, amount: int
     ):
@@ -91,73 +89,98 @@ class Money_TransferCommand(commands.Cog):
                 "reaction_add", timeout=30.0, check=check
             )
             if str(reaction.emoji) == "✅":
-                money_collection.update_one(
-                    {"uid": ctx.author.id},
-                    {"$inc": {"bank": -amount}},
-                )
+                # Both users are locked from here, the balances may have changed while waiting for the reaction
+                async with MONEY_LOCKS.lock_many(ctx.author.id, member.id):
+                    query = money_collection.find_one({"uid": ctx.author.id})
+                    user = query if query else {}
+
+                    query = money_collection.find_one({"uid": member.id})
+                    recieving_user = query if query else {}
+
+                    if user.get("bank", 0) < amount:
+                        embed = discord.Embed(
+                            title="Transfer Failed",
+                            description="You no longer have enough money in your bank to transfer that amount.",
+                            color=ERROR_EMBED_COLOR,
+                        )
+                        embed.set_footer(text="Better Hood Money")
+                        await message.edit(embed=embed)
+                        await message.clear_reactions()
+                        ctx.command.reset_cooldown(ctx)
+                        return
+
+                    money_collection.update_one(
+                        {"uid": ctx.author.id},
+                        {"$inc": {"bank": -amount}},
+                    )
 
-                money_collection.update_one(
-                    {"uid": member.id},
-                    {"$inc": {"bank": net_amount}},
-                    upsert=True,
-                )
+                    money_collection.update_one(
+                        {"uid": member.id},
+                        {"$inc": {"bank": net_amount}},
+                        upsert=True,
+                    )
 
-                try:
-                    webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-                except KeyError:
-                    RICKLOG.critical(
-                        "No webhook URL found for transaction logging. Not logging this transaction."
+                    self.bot.ledger.record(
+                        ctx.author.id,
+                        "transfer",
+                        amount,
+                        before=balances(user),
+                        after={
+                            "wallet": user.get("wallet", 0),
+                            "bank": user.get("bank", 0) - amount,
+                        },
+                        counterparty=member.id,
+                    )
+                    self.bot.ledger.record(
+                        member.id,
+                        "transfer",
+                        net_amount,
+                        before=balances(recieving_user),
+                        after={
+                            "wallet": recieving_user.get("wallet", 0),
+                            "bank": recieving_user.get("bank", 0) + net_amount,
+                        },
+                        counterparty=ctx.author.id,
                     )
-                else:
-                    async with aiohttp.ClientSession() as session:
-                        webhook: discord.Webhook = discord.Webhook.from_url(
-                            webhook_url, session=session
-                        )
 
-                        webhook_embed = discord.Embed(
-                            title="Bank Transfer",
-                            description=f"{ctx.author.mention} has transferred {format_money(amount)} to {member.mention}.",
-                            color=ERROR_EMBED_COLOR,
-                        )
+                    webhook_embed = discord.Embed(
+                        title="Bank Transfer",
+                        description=f"{ctx.author.mention} has transferred {format_money(amount)} to {member.mention}.",
+                        color=ERROR_EMBED_COLOR,
+                    )
 
-                        webhook_embed.add_field(
-                            name="Sender's Original Bank",
-                            value=format_money(user.get("bank", 0)),
-                        )
+                    webhook_embed.add_field(
+                        name="Sender's Original Bank",
+                        value=format_money(user.get("bank", 0)),
+                    )
 
-                        webhook_embed.add_field(
-                            name="Sender's New Bank",
-                            value=format_money(user.get("bank", 0) - amount),
-                        )
+                    webhook_embed.add_field(
+                        name="Sender's New Bank",
+                        value=format_money(user.get("bank", 0) - amount),
+                    )
 
-                        webhook_embed.add_field(
-                            name="Recipient's Original Bank",
-                            value=format_money(recieving_user.get("bank", 0)),
-                        )
+                    webhook_embed.add_field(
+                        name="Recipient's Original Bank",
+                        value=format_money(recieving_user.get("bank", 0)),
+                    )
 
-                        webhook_embed.add_field(
-                            name="Recipient's New Bank",
-                            value=format_money(
-                                recieving_user.get("bank", 0) + net_amount
-                            ),
-                        )
+                    webhook_embed.add_field(
+                        name="Recipient's New Bank",
+                        value=format_money(recieving_user.get("bank", 0) + net_amount),
+                    )
 
-                        webhook_embed.set_footer(text="Better Hood Money")
+                    webhook_embed.set_footer(text="Better Hood Money")
 
-                        await webhook.send(
-                            username="Better Hood Money Transactions",
-                            avatar_url=self.bot.user.avatar.url,
-                            embed=webhook_embed,
-                        )
+                    self.bot.transaction_log.enqueue(webhook_embed)
 
-                confirmation_embed = discord.Embed(
-                    title="Transfer Successful",
-                    description=f"Successfully transferred {format_money(net_amount)} to {member.display_name} after a {format_money(tax)} tax deduction.",
-                    color=SUCCESS_EMBED_COLOR,
-                )
-                confirmation_embed.set_footer(text="Better Hood Money")
-                await message.edit(embed=confirmation_embed)
-                await message.clear_reactions()
+                    confirmation_embed = discord.Embed(
+                        title="Transfer Successful",
+                        description=f"Successfully transferred {format_money(net_amount)} to {member.display_name} after a {format_money(tax)} tax deduction.",
+                        color=SUCCESS_EMBED_COLOR,
+                    )
+                    confirmation_embed.set_footer(text="Better Hood Money")
+                    await message.edit(embed=confirmation_embed)
+                    await message.clear_reactions()
             elif str(reaction.emoji) == "❌":
                 cancel_embed = discord.Embed(
                     title="Transfer Cancelled",
@@ -7,21 +7,18 @@ This cog is for the withdraw command, which allows users to withdraw money from
 
 # Third-party libraries
 from discord.ext import commands
-import aiohttp
 import discord
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR, SUCCESS_EMBED_COLOR
 from helpers.custom.format import format_money, format_time
 from helpers.errors import handle_error
-from helpers.logs import RICKLOG
+from helpers.ledger import balances
+from helpers.locks import money_lock
 
 # Database
 from helpers.db import money_collection
 
-# Config
-from helpers.config import CUSTOM_CONFIG
-
 
 class Money_WithdrawCommand(commands.Cog):
     """A cog for handling the withdraw command in a Discord bot."""
@@ -30,6 +27,7 @@ class Money_WithdrawCommand(commands.Cog):
         self.bot = bot
 
     @commands.command(name="withdraw", aliases=["with"])
+    @money_lock()
     async def _withdraw(self, ctx: commands.Context, amount: int):
         """Withdraws money from the bank to the wallet."""
         if amount < 1:
@@ -60,41 +58,36 @@ class Money_WithdrawCommand(commands.Cog):
             {"$inc": {"wallet": amount, "bank": -amount}},
         )
 
-        try:
-            webhook_url = CUSTOM_CONFIG["logging"]["transactions"]["webhook"]
-        except KeyError:
-            RICKLOG.critical(
-                "No webhook URL found for transaction logging. Not logging this transaction."
-            )
-        else:
-            async with aiohttp.ClientSession() as session:
-                webhook: discord.Webhook = discord.Webhook.from_url(
-                    webhook_url, session=session
-                )
-
-                webhook_embed = discord.Embed(
-                    title="Withdrawal",
-                    description=f"{ctx.author.mention} has withdrawn {format_money(amount)} from their bank.",
-                    color=ERROR_EMBED_COLOR,
-                )
-
-                webhook_embed.add_field(
-                    name="Original Bank",
-                    value=format_money(user.get("bank", 0)),
-                )
-
-                webhook_embed.add_field(
-                    name="New Bank",
-                    value=format_money(user.get("bank", 0) - amount),
-                )
-
-                webhook_embed.set_footer(text="Better Hood Money")
-
-                await webhook.send(
-                    username="Better Hood Money Transactions",
-                    avatar_url=self.bot.user.avatar.url,
-                    embed=webhook_embed,
-                )
+        self.bot.ledger.record(
+            ctx.author.id,
+            "withdraw",
+            amount,
+            before=balances(user),
+            after={
+                "wallet": user.get("wallet", 0) + amount,
+                "bank": user.get("bank", 0) - amount,
+            },
+        )
+
+        webhook_embed = discord.Embed(
+            title="Withdrawal",
+            description=f"{ctx.author.mention} has withdrawn {format_money(amount)} from their bank.",
+            color=ERROR_EMBED_COLOR,
+        )
+
+        webhook_embed.add_field(
+            name="Original Bank",
+            value=format_money(user.get("bank", 0)),
+        )
+
+        webhook_embed.add_field(
+            name="New Bank",
+            value=format_money(user.get("bank", 0) - amount),
+        )
+
+        webhook_embed.set_footer(text="Better Hood Money")
+
+        self.bot.transaction_log.enqueue(webhook_embed)
 
         embed = discord.Embed(
             title="Success",
@@ -0,0 +1,237 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This cog pays interest on bank balances once a day (UTC).
+
+Every account is paid in a single update_many with an aggregation pipeline, so the work stays on the database
+no matter how many accounts there are. Each account paid is stamped with the period, and only accounts without
+that stamp are matched, so a run that crashes part way through can be repeated without paying anyone twice.
+
+It is off by default, enable it with "interest": {"enabled": true, "rate": 0.005, "cap": 5000} in config.json,
+rate is per day and cap is the most interest a single account earns in a day.
+"""
+
+# Python standard library
+from datetime import datetime, timezone
+import asyncio
+import time
+
+# Third-party libraries
+from discord.ext import commands
+from pymongo.errors import PyMongoError
+import discord
+
+# Helper functions
+from helpers.colors import MAIN_EMBED_COLOR
+from helpers.custom.format import format_money
+from helpers.logs import RICKLOG_BG
+
+# Database
+from helpers import db
+
+# Config
+from helpers.config import get_config
+
+# Constants
+
+DEFAULT_INTEREST_RATE = 0.005
+DEFAULT_INTEREST_CAP = 5000
+
+# How often the job checks whether today's interest has been paid (seconds)
+INTEREST_CHECK_INTERVAL = 600
+
+# The aggregate ledger record isn't any user's, it's recorded against uid 0 (the bank)
+INTEREST_LEDGER_UID = 0
+
+# Functions
+
+
+def interest_period(now: datetime | None = None) -> str:
+    """
+    The period interest is paid for, the UTC date.
+    """
+
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+def pay_interest(period: str, rate: float, cap: int) -> dict:
+    """
+    Pay interest on every positive bank balance not yet paid for period, blocking.
+
+    Returns the accounts paid by this run, and the accounts, interest and bank total for the whole period.
+    """
+
+    result = db.money_collection.update_many(
+        {"bank": {"$gt": 0}, "interest_period": {"$ne": period}},
+        [
+            {
+                "$set": {
+                    # Capped before converting, so a huge (float) balance can't overflow a long,
+                    # and $convert never raises, one bad document can't fail the update for everyone
+                    "interest_paid": {
+                        "$convert": {
+                            "input": {
+                                "$min": [
+                                    cap,
+                                    {"$floor": {"$multiply": ["$bank", rate]}},
+                                ]
+                            },
+                            "to": "long",
+                            "onError": 0,
+                            "onNull": 0,
+                        }
+                    }
+                }
+            },
+            {
+                "$set": {
+                    "bank": {"$add": ["$bank", "$interest_paid"]},
+                    "interest_period": period,
+                }
+            },
+        ],
+    )
+
+    # Totals cover the whole period, including accounts paid by a run that crashed
+    totals = list(
+        db.money_collection.aggregate(
+            [
+                {"$match": {"interest_period": period}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "accounts": {"$sum": 1},
+                        "interest": {"$sum": "$interest_paid"},
+                        "bank": {"$sum": "$bank"},
+                    }
+                },
+            ]
+        )
+    )
+    totals = totals[0] if totals else {"accounts": 0, "interest": 0, "bank": 0}
+
+    return {
+        "modified": result.modified_count,
+        "accounts": totals["accounts"],
+        "interest": totals["interest"],
+        "bank": totals["bank"],
+    }
+
+
+def record_interest(period: str, totals: dict) -> bool:
+    """
+    Write the aggregate ledger record for period, once, blocking.
+
+    Returns True if it was written, False if the period already has one.
+    """
+
+    result = db.ledger_collection.update_one(
+        {"_id": f"interest:{period}"},
+        {
+            "$setOnInsert": {
+                "uid": INTEREST_LEDGER_UID,
+                "counterparty": None,
+                "type": "interest",
+                "amount": totals["interest"],
+                "before": {"bank": totals["bank"] - totals["interest"]},
+                "after": {"bank": totals["bank"]},
+                "accounts": totals["accounts"],
+                "period": period,
+                "ts": datetime.now(timezone.utc),
+            }
+        },
+        upsert=True,
+    )
+
+    return result.upserted_id is not None
+
+
+class Money_InterestTask(commands.Cog):
+    """A cog paying daily interest on bank balances."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self._task: asyncio.Task = None  # type: ignore
+
+    async def cog_load(self):
+        self._task = asyncio.create_task(self._interest_loop())
+
+    async def cog_unload(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _interest_loop(self):
+        await self.bot.wait_until_ready()
+
+        while True:
+            config = get_config().config.get("interest", {})
+
+            # Off unless enabled, interest adds money to every account
+            if config.get("enabled", False):
+                try:
+                    await self.run(
+                        float(config.get("rate", DEFAULT_INTEREST_RATE)),
+                        int(config.get("cap", DEFAULT_INTEREST_CAP)),
+                    )
+                except PyMongoError as e:
+                    RICKLOG_BG.error(f"Failed to pay interest, will retry: {e}")
+
+            await asyncio.sleep(INTEREST_CHECK_INTERVAL)
+
+    async def run(self, rate: float, cap: int) -> None:
+        """
+        Pay today's interest if it hasn't been paid yet.
+        """
+
+        period = interest_period()
+
+        state = await asyncio.to_thread(
+            db.state_collection.find_one, {"_id": "interest"}
+        )
+        if state is not None and state.get("period") == period:
+            return
+
+        start = time.perf_counter()
+        totals = await asyncio.to_thread(pay_interest, period, rate, cap)
+        elapsed = time.perf_counter() - start
+
+        RICKLOG_BG.info(
+            f"Paid interest for {period} to {totals['modified']} account(s) in {elapsed * 1000:.0f}ms "
+            f"({totals['accounts']} paid this period, {format_money(totals['interest'])} in total)."
+        )
+
+        if await asyncio.to_thread(record_interest, period, totals):
+            webhook_embed = discord.Embed(
+                title="Bank Interest",
+                description=f"Interest for {period} has been paid at {rate:.2%} (capped at {format_money(cap)}).",
+                color=MAIN_EMBED_COLOR,
+            )
+            webhook_embed.add_field(name="Accounts", value=f"{totals['accounts']:,}")
+            webhook_embed.add_field(
+                name="Interest Paid", value=format_money(totals["interest"])
+            )
+            webhook_embed.add_field(name="Took", value=f"{elapsed * 1000:.0f}ms")
+            webhook_embed.set_footer(text="Better Hood Money")
+
+            self.bot.transaction_log.enqueue(webhook_embed)
+
+        await asyncio.to_thread(
+            db.state_collection.update_one,
+            {"_id": "interest"},
+            {
+                "$set": {
+                    "period": period,
+                    "accounts": totals["accounts"],
+                    "interest": totals["interest"],
+                    "duration": elapsed,
+                    "ts": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Money_InterestTask(bot))
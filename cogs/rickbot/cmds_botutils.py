@@ -7,6 +7,7 @@ as well as a leaderboard command that shows the top 10 users with the most n-wor
 """
 
 # Python standard library
+import asyncio
 import subprocess
 
 # Third-party libraries
@@ -18,7 +19,7 @@ from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
 from helpers.errors import handle_error
 
 # Config
-from helpers.config import CONFIG
+from helpers.config import get_config
 
 
 class RickBot_BotUtilsCommands(commands.Cog):
@@ -26,7 +27,7 @@ class RickBot_BotUtilsCommands(commands.Cog):
         self.bot = bot
 
     def botownercheck(ctx):
-        return ctx.author.id in CONFIG["devs"]
+        return get_config().is_dev(ctx.author.id)
 
     @commands.command()
     @commands.check(botownercheck)
@@ -127,7 +128,101 @@ class RickBot_BotUtilsCommands(commands.Cog):
         embed = discord.Embed(title="Restarting...", color=MAIN_EMBED_COLOR)
         await ctx.reply(embed=embed, mention_author=False)
 
-        subprocess.run(["systemctl", "restart", "betterhoodbot"])
+        # Don't wait for systemctl, it waits for this process to shut down (which drains this command)
+        await asyncio.create_subprocess_exec("systemctl", "restart", "betterhoodbot")
+
+    @commands.group(name="errors", invoke_without_command=True)
+    @commands.check(botownercheck)
+    async def errors(self, ctx: commands.Context, limit: int = 10):
+        """
+        List the most frequent error fingerprints.
+        """
+
+        top = await self.bot.error_reporter.top(min(max(limit, 1), 25))
+
+        embed = discord.Embed(title="Errors", color=MAIN_EMBED_COLOR)
+
+        if not top:
+            embed.description = "No errors recorded."
+
+        for entry in top:
+            value = (
+                f"{entry.exc_type}: {entry.message[:100]}\n"
+                f"Seen {entry.count} time(s), first {discord.utils.format_dt(entry.first_seen, 'R')}, "
+                f"last {discord.utils.format_dt(entry.last_seen, 'R')}"
+            )
+
+            if entry.samples:
+                value += f"\nLast command: {entry.samples[-1].get('command')}"
+
+            if entry.paste_link:
+                value += f"\n[View as Paste]({entry.paste_link})"
+
+            name = f"`{entry.fingerprint}`" + (" ✅" if entry.acknowledged else "")
+            embed.add_field(name=name, value=value, inline=False)
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @errors.command(name="ack", aliases=["acknowledge"])
+    @commands.check(botownercheck)
+    async def errors_ack(self, ctx: commands.Context, fingerprint: str):
+        """
+        Mark an error fingerprint, or all of them, as checked.
+        """
+
+        acknowledged = await self.bot.error_reporter.acknowledge(
+            None if fingerprint == "all" else fingerprint
+        )
+
+        embed = discord.Embed(
+            title="Errors",
+            description=f"Acknowledged {acknowledged} error(s).",
+            color=MAIN_EMBED_COLOR,
+        )
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @errors.error
+    @errors_ack.error
+    async def errors_error(self, ctx, error):
+        if isinstance(error, commands.CheckFailure):
+            embed = discord.Embed(
+                title="Error",
+                description="Only the bot developer can run this command.",
+                color=ERROR_EMBED_COLOR,
+            )
+            await ctx.reply(embed=embed, mention_author=False)
+
+        else:
+            await handle_error(ctx, error)
+
+    @commands.command(name="sync")
+    @commands.check(botownercheck)
+    async def sync(self, ctx: commands.Context):
+        """
+        Force a re-sync of the application commands.
+        """
+
+        await self.bot.sync_tree(force=True)
+
+        embed = discord.Embed(
+            title="Sync",
+            description="Application commands synced.",
+            color=MAIN_EMBED_COLOR,
+        )
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @sync.error
+    async def sync_error(self, ctx, error):
+        if isinstance(error, commands.CheckFailure):
+            embed = discord.Embed(
+                title="Error",
+                description="Only the bot developer can run this command.",
+                color=ERROR_EMBED_COLOR,
+            )
+            await ctx.reply(embed=embed, mention_author=False)
+
+        else:
+            await handle_error(ctx, error)
 
     @commands.command()
     @commands.check(botownercheck)
@@ -0,0 +1,201 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This cog provides the !perf command, a snapshot of the bot's runtime performance, and the !lag command,
+what has blocked the event loop, for the developers.
+"""
+
+# Python standard library
+import time
+
+# Third-party libraries
+from discord.ext import commands
+import discord
+
+# Helper functions
+from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
+from helpers.errors import handle_error
+from helpers.metrics import METRICS, rss_bytes
+
+# Config
+from helpers.config import get_config
+
+# Constants
+
+# Window for the loop lag percentiles (seconds)
+PERF_LOOP_LAG_WINDOW = 300
+
+# Window for commands per minute (seconds)
+PERF_COMMANDS_WINDOW = 600
+
+# Number of slowest commands listed
+PERF_SLOWEST_COMMANDS = 5
+
+# Number of loop blockers listed by !lag
+LAG_OFFENDERS = 10
+
+# Longest stack sample shown by !lag (characters)
+LAG_STACK_LENGTH = 3900
+
+# Functions
+
+
+def format_percentiles(percentiles: dict) -> str:
+    if not percentiles:
+        return "No samples"
+
+    return " / ".join(
+        f"p{point} `{value:.1f}ms`" for point, value in percentiles.items()
+    )
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+
+    return f"{days}d {hours}h {minutes}m {seconds}s"
+
+
+class RickBot_PerfCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    def botownercheck(ctx):
+        return get_config().is_dev(ctx.author.id)
+
+    @commands.command(name="perf")
+    @commands.check(botownercheck)
+    async def _perf(self, ctx: commands.Context):
+        """
+        Show gateway latency, loop lag, memory, cache sizes, database latency and command timings.
+        """
+
+        commands_timing = METRICS.timing("commands")
+        commands_per_minute = (
+            commands_timing.count(PERF_COMMANDS_WINDOW) / PERF_COMMANDS_WINDOW * 60
+        )
+
+        embed = discord.Embed(title="Performance", color=MAIN_EMBED_COLOR)
+
+        embed.add_field(
+            name="Gateway Latency",
+            value=f"`{self.bot.latency * 1000:.1f}ms`",
+            inline=True,
+        )
+        embed.add_field(
+            name="Memory (RSS)",
+            value=f"`{rss_bytes() / 1024 / 1024:.1f} MiB`",
+            inline=True,
+        )
+        embed.add_field(
+            name="Uptime",
+            value=f"`{format_duration(time.monotonic() - METRICS.started_at)}`",
+            inline=True,
+        )
+
+        embed.add_field(
+            name=f"Loop Lag (last {PERF_LOOP_LAG_WINDOW // 60}m)",
+            value=format_percentiles(
+                METRICS.timing("loop_lag").percentiles(PERF_LOOP_LAG_WINDOW)
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="MongoDB Latency (last hour)",
+            value=format_percentiles(METRICS.timing("mongo").percentiles()),
+            inline=False,
+        )
+
+        cache_sizes = METRICS.cache_sizes()
+        embed.add_field(
+            name="Caches",
+            value="\n".join(
+                f"{name}: `{size:,}`" for name, size in sorted(cache_sizes.items())
+            )
+            or "None registered",
+            inline=False,
+        )
+
+        embed.add_field(
+            name="Commands",
+            value=f"`{commands_per_minute:.2f}` per minute (last {PERF_COMMANDS_WINDOW // 60}m)\n"
+            f"{format_percentiles(commands_timing.percentiles())} (last hour)",
+            inline=False,
+        )
+
+        slowest = commands_timing.slowest(limit=PERF_SLOWEST_COMMANDS)
+        embed.add_field(
+            name="Slowest Commands (last hour)",
+            value="\n".join(
+                f"`{name}` `{peak:.1f}ms` ({count} run{'s' if count != 1 else ''})"
+                for name, peak, count in slowest
+            )
+            or "No commands run",
+            inline=False,
+        )
+
+        embed.set_footer(text=f"RickBot | {ctx.bot.user.name}")
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @commands.command(name="lag")
+    @commands.check(botownercheck)
+    async def _lag(self, ctx: commands.Context, offender: int = None):  # type: ignore
+        """
+        List what has blocked the event loop, or show the last stack sample of one offender.
+        """
+
+        offenders = self.bot.watchdog.offenders(LAG_OFFENDERS)
+
+        if offender is None:
+            embed = discord.Embed(
+                title="Event Loop Blockers",
+                description="\n".join(
+                    f"**{i}.** `{stall.label}`\n{stall.count} stall(s), worst `{stall.worst * 1000:.0f}ms`, total `{stall.total * 1000:.0f}ms`"
+                    for i, stall in enumerate(offenders, start=1)
+                )
+                or "The event loop hasn't been blocked.",
+                color=MAIN_EMBED_COLOR,
+            )
+            embed.set_footer(
+                text=f"Stalls over {self.bot.watchdog.threshold * 1000:.0f}ms | Use {get_config().prefix}lag <number> for a stack sample"
+            )
+
+        elif 1 <= offender <= len(offenders):
+            stall = offenders[offender - 1]
+            stack = "".join(stall.stack)[-LAG_STACK_LENGTH:]
+
+            embed = discord.Embed(
+                title=f"Stack Sample: {stall.label}",
+                description=f"```py\n{stack}```",
+                color=MAIN_EMBED_COLOR,
+            )
+
+        else:
+            embed = discord.Embed(
+                title="Error",
+                description=f"There is no offender number {offender}.",
+                color=ERROR_EMBED_COLOR,
+            )
+
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @_perf.error
+    @_lag.error
+    async def _perf_error(self, ctx, error):
+        if isinstance(error, commands.CheckFailure):
+            embed = discord.Embed(
+                title="Error",
+                description="Only the bot developer can run this command.",
+                color=ERROR_EMBED_COLOR,
+            )
+            await ctx.reply(embed=embed, mention_author=False)
+
+        else:
+            await handle_error(ctx, error)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RickBot_PerfCommands(bot))
@@ -15,14 +15,25 @@ from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
 from helpers.errors import handle_error
 
 # Config
-from helpers.config import CUSTOM_CONFIG
+from helpers.config import get_config, subscribe, unsubscribe
 
 
 class Utils_ColorCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-        self.color_role_ids = CUSTOM_CONFIG["color_cmd"]["colors"]
+        self.color_role_ids = get_config().color_role_ids
+        self.color_role_id_set = get_config().color_role_id_set
+
+    async def cog_load(self):
+        subscribe(self.on_config_reload)
+
+    async def cog_unload(self):
+        unsubscribe(self.on_config_reload)
+
+    def on_config_reload(self, old, new):
+        self.color_role_ids = new.color_role_ids
+        self.color_role_id_set = new.color_role_id_set
 
     def format_color(self, color):
         return f"`{color}` - <@&{self.color_role_ids[color]}>"
@@ -57,7 +68,7 @@ class Utils_ColorCommand(commands.Cog):
 
         # Check if the user has a color role already
         for crole in ctx.author.roles:
-            if crole.id in self.color_role_ids.values():
+            if crole.id in self.color_role_id_set:
                 await ctx.author.remove_roles(
                     crole, reason="User requested color change."
                 )
@@ -10,11 +10,11 @@ from typing import Union
 
 # Third-party libraries
 from discord.ext import commands
-from fuzzywuzzy import process
 import discord
 
 # Helper functions
 from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
+from helpers.workers import best_match
 
 
 class Utils_RoleCommand(commands.Cog):
@@ -48,7 +48,7 @@ class Utils_RoleCommand(commands.Cog):
 
         # Resolve the role from a string name if necessary
         if isinstance(role, str):
-            role = self._find_closest_role(guild.roles, role)
+            role = await self._find_closest_role(guild.roles, role)
             if not role:
                 await self._send_error(
                     ctx, "The role name you provided does not exist."
@@ -106,11 +106,11 @@ class Utils_RoleCommand(commands.Cog):
         else:
             await self._send_error(ctx, "Invalid action. Use `add` or `remove`.")
 
-    def _find_closest_role(self, roles, role_name):
-        """Find the closest matching role by name."""
+    async def _find_closest_role(self, roles, role_name):
+        """Find the closest matching role by name, off the event loop."""
         names = {role.name: role for role in roles}
-        best_match, _ = process.extractOne(role_name, names.keys())  # type: ignore
-        return names.get(best_match)
+        match = await self.bot.workers.run(best_match, role_name, list(names))
+        return names.get(match)
 
     async def _send_error(self, ctx, message):
         """Send an error embed."""
@@ -121,7 +121,7 @@ class Utils_RoleCommand(commands.Cog):
         if isinstance(action, discord.Role):
             return action
         if isinstance(action, str):
-            return self._find_closest_role(ctx.guild.roles, action)
+            return await self._find_closest_role(ctx.guild.roles, action)
         await self._send_error(ctx, "The role specified could not be resolved.")
         return None
 
@@ -6,6 +6,7 @@ from datetime import datetime
 from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
 from helpers.errors import handle_error
 from helpers.db import invites_collection, users_collection
+from helpers.metrics import METRICS
 
 
 class Utils_InviteTrackerCommands(commands.Cog):
@@ -13,6 +14,15 @@ class Utils_InviteTrackerCommands(commands.Cog):
         self.bot = bot
         self.invites_cache = {}
 
+    async def cog_load(self):
+        METRICS.register_cache(
+            "invites_cache",
+            lambda: sum(len(invites) for invites in self.invites_cache.values()),
+        )
+
+    async def cog_unload(self):
+        METRICS.unregister_cache("invites_cache")
+
     async def cache_invites(self):
         """Caches the current invites for all guilds the bot is in."""
         for guild in self.bot.guilds:
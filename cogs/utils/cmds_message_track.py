@@ -44,14 +44,16 @@ class Utils_MessageTrackingCommands(commands.Cog):
             return
 
         RICKLOG_BG.debug(
-            f"{message.author} sent a message, checking if they have been logged before..."
+            "%s sent a message, checking if they have been logged before...",
+            message.author,
         )
 
         user_logger = messages_collection.find_one({"_id": message.author.id})
 
         if user_logger is None:
             RICKLOG_BG.debug(
-                f"{message.author} has not been logged before, creating a new document..."
+                "%s has not been logged before, creating a new document...",
+                message.author,
             )
             user_logger = {
                 "_id": message.author.id,
@@ -60,7 +62,8 @@ class Utils_MessageTrackingCommands(commands.Cog):
             messages_collection.insert_one(user_logger)
         else:
             RICKLOG_BG.debug(
-                f"{message.author} has been logged before, incrementing their count..."
+                "%s has been logged before, incrementing their count...",
+                message.author,
             )
             messages_collection.update_one(
                 {"_id": message.author.id}, {"$inc": {"count": 1}}
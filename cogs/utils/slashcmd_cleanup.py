@@ -48,9 +48,25 @@ class Utils_CleanupSlashCommands(commands.Cog):
     async def _bot_cleanup(self, interaction: discord.Interaction, limit: int = 100):
         await interaction.response.defer()
 
-        # Fetch the messages
+        # Iterate through the messages, recent ones come from the message index and only older ones are fetched
+        to_bulk_delete = []
+        to_delete_14_days_old = []
+
         try:
-            query = interaction.channel.history(limit=limit)
+            async for message in self.bot.message_index.recent(
+                interaction.channel, limit
+            ):
+                if interaction.message and message.id == interaction.message.id:
+                    continue
+
+                if message.bot or message.author_id == self.bot.user.id:
+                    to_bulk_delete.append(message)
+                elif message.prefix.startswith(tuple(self.list_of_common_prefixes)):
+                    to_bulk_delete.append(message)
+                elif message.prefix.startswith("```"):
+                    to_bulk_delete.append(message)
+                elif message.prefix.startswith("/"):
+                    to_bulk_delete.append(message)
 
         except discord.errors.Forbidden as error:
             embed = discord.Embed(
@@ -76,23 +92,6 @@ class Utils_CleanupSlashCommands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # Iterate through the messages
-        to_bulk_delete = []
-        to_delete_14_days_old = []
-
-        async for message in query:
-            if message == interaction.message:
-                continue
-
-            if message.author.bot or message.author == self.bot.user:
-                to_bulk_delete.append(message)
-            elif message.content.startswith(tuple(self.list_of_common_prefixes)):
-                to_bulk_delete.append(message)
-            elif message.content.startswith("```"):
-                to_bulk_delete.append(message)
-            elif message.content.startswith("/"):
-                to_bulk_delete.append(message)
-
         # Check if message is older than 13 days
         for message in to_bulk_delete:
             if (datetime.datetime.now(datetime.UTC) - message.created_at).days >= 13:
@@ -197,9 +196,10 @@ class Utils_CleanupSlashCommands(commands.Cog):
 
                 if view.value:
                     for message in to_delete_14_days_old:
-                        message: discord.Message
                         try:
-                            await message.delete()
+                            await interaction.channel.get_partial_message(
+                                message.id
+                            ).delete()
                         except discord.errors.Forbidden as error:
                             unable_to_delete.append(message)
                         except discord.errors.HTTPException as error:
@@ -16,13 +16,24 @@ from helpers.colors import MAIN_EMBED_COLOR, ERROR_EMBED_COLOR
 from helpers.errors import handle_error
 
 # Config
-from helpers.config import CUSTOM_CONFIG
+from helpers.config import get_config, subscribe, unsubscribe
 
 
 class Utils_ColorSlashCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.color_role_ids = CUSTOM_CONFIG["color_cmd"]["colors"]
+        self.color_role_ids = get_config().color_role_ids
+        self.color_role_id_set = get_config().color_role_id_set
+
+    async def cog_load(self):
+        subscribe(self.on_config_reload)
+
+    async def cog_unload(self):
+        unsubscribe(self.on_config_reload)
+
+    def on_config_reload(self, old, new):
+        self.color_role_ids = new.color_role_ids
+        self.color_role_id_set = new.color_role_id_set
 
     def format_color(self, color):
         return f"`{color}` - <@&{self.color_role_ids[color]}>"
@@ -32,7 +43,7 @@ class Utils_ColorSlashCommand(commands.Cog):
     @app_commands.choices(
         color=[
             app_commands.Choice(name=color.capitalize(), value=color)
-            for color in CUSTOM_CONFIG["color_cmd"]["colors"]
+            for color in get_config().color_role_ids
         ]
     )
     async def _color(self, interaction: discord.Interaction, color: str):
@@ -62,7 +73,7 @@ class Utils_ColorSlashCommand(commands.Cog):
 
         # Remove any existing color roles
         roles_to_remove = [
-            r for r in interaction.user.roles if r.id in self.color_role_ids.values()
+            r for r in interaction.user.roles if r.id in self.color_role_id_set
         ]
         await interaction.user.remove_roles(
             *roles_to_remove, reason="User requested color change."
@@ -8,12 +8,19 @@ This is the config file for RickBot.
 # Import the required modules
 
 # Python standard library
+from collections.abc import Mapping
+from datetime import datetime
+import asyncio
+import inspect
 import json
 import os
 
 # Helpers
 from helpers.logs import RICKLOG_MAIN
 
+# How often the config files are checked for changes (seconds)
+CONFIG_WATCH_INTERVAL = 5.0
+
 # DEFAULT CONFIG
 
 DEFAULT_CONFIG = {
@@ -35,6 +42,13 @@ DEFAULT_CONFIG = {
         "uri": "mongodb uri",
         "bot_specific_db": "bot",
     },
+    "logging": {
+        "json": {
+            "enabled": False,
+            "path": "logs/rickbot.jsonl",
+            "sample": {"rickbot.bg": {"DEBUG": 100}},
+        },
+    },
 }
 
 # Custom Config
@@ -84,73 +98,80 @@ If the config.json file is missing any required fields, abort the bot and tell t
 We can tell if any fields are missing by ensuring no fields match the default config or are empty.
 """
 
-need_to_exit = False
 
-# Ensure a mode is set
-if CONFIG.get("mode") in [None, ""]:
-    RICKLOG_MAIN.critical("The 'mode' field in the config.json file is missing.")
-    need_to_exit = True
+def validate_config(config: dict) -> list[str]:
+    """
+    Check a config for missing required fields.
 
-# Ensure the devs list is set
-if CONFIG.get("devs") in [None, ""]:
-    RICKLOG_MAIN.critical("The 'devs' field in the config.json file is missing.")
-    need_to_exit = True
+    Returns a list of problems, empty if the config is valid.
+    """
 
-# Ensure the bot settings are set
-bot_config = CONFIG.get("bot")
+    problems = []
 
-if bot_config.get("token") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'token' field in the bot settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    # Ensure a mode is set
+    if config.get("mode") in [None, ""]:
+        problems.append("The 'mode' field in the config.json file is missing.")
 
-if bot_config.get("prefix") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'prefix' field in the bot settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    # Ensure the devs list is set
+    if config.get("devs") in [None, ""]:
+        problems.append("The 'devs' field in the config.json file is missing.")
 
-bot_config_status = bot_config.get("status")
+    # Ensure the bot settings are set
+    bot_config = config.get("bot") or {}
 
-if bot_config_status.get("type") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'type' field in the bot status settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    if bot_config.get("token") in [None, ""]:
+        problems.append(
+            "The 'token' field in the bot settings in the config.json file is missing."
+        )
 
-if bot_config_status.get("message") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'message' field in the bot status settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    if bot_config.get("prefix") in [None, ""]:
+        problems.append(
+            "The 'prefix' field in the bot settings in the config.json file is missing."
+        )
 
-# Ensure the behaviour settings are set
-behaviour_config = CONFIG.get("behaviour")
+    bot_config_status = bot_config.get("status") or {}
 
-if behaviour_config.get("continue_to_load_cogs_after_failure") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'continue_to_load_cogs_after_failure' field in the behaviour settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    if bot_config_status.get("type") in [None, ""]:
+        problems.append(
+            "The 'type' field in the bot status settings in the config.json file is missing."
+        )
 
-# Ensure the mongo settings are set
-mongo_config = CONFIG.get("mongo")
+    if bot_config_status.get("message") in [None, ""]:
+        problems.append(
+            "The 'message' field in the bot status settings in the config.json file is missing."
+        )
 
-if mongo_config.get("uri") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'uri' field in the mongo settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    # Ensure the behaviour settings are set
+    behaviour_config = config.get("behaviour") or {}
 
-if mongo_config.get("bot_specific_db") in [None, ""]:
-    RICKLOG_MAIN.critical(
-        "The 'bot_specific_db' field in the mongo settings in the config.json file is missing."
-    )
-    need_to_exit = True
+    if behaviour_config.get("continue_to_load_cogs_after_failure") in [None, ""]:
+        problems.append(
+            "The 'continue_to_load_cogs_after_failure' field in the behaviour settings in the config.json file is missing."
+        )
+
+    # Ensure the mongo settings are set
+    mongo_config = config.get("mongo") or {}
+
+    if mongo_config.get("uri") in [None, ""]:
+        problems.append(
+            "The 'uri' field in the mongo settings in the config.json file is missing."
+        )
+
+    if mongo_config.get("bot_specific_db") in [None, ""]:
+        problems.append(
+            "The 'bot_specific_db' field in the mongo settings in the config.json file is missing."
+        )
+
+    return problems
+
+
+problems = validate_config(CONFIG)
+
+for problem in problems:
+    RICKLOG_MAIN.critical(problem)
 
 # Exit the bot if any required fields are missing
-if need_to_exit:
+if problems:
     RICKLOG_MAIN.critical(
         "Bot cannot start. Please fill in the required fields in the config.json file."
     )
@@ -158,3 +179,252 @@ if need_to_exit:
         "Once you have filled in the required fields, restart the bot to apply the changes."
     )
     exit()
+
+
+# Config snapshots
+#
+# CONFIG and CUSTOM_CONFIG above are the raw dicts as loaded at startup.
+# Everything else should use get_config(), which returns an immutable snapshot
+# that is swapped atomically when the config files are reloaded.
+
+# Keys that can't change without a restart, a reload that changes them only logs a warning
+RESTART_REQUIRED_KEYS = ("bot.token", "mongo", "gateway", "workers")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return ConfigNode(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ConfigNode(Mapping):
+    """
+    A read-only view of a config section with attribute access.
+
+    config.bot.prefix is the same as config["bot"]["prefix"].
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict):
+        object.__setattr__(
+            self, "_data", {key: _freeze(value) for key, value in data.items()}
+        )
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config snapshots are read-only.")
+
+    def __repr__(self):
+        return f"ConfigNode({self._data!r})"
+
+    def path(self, dotted: str, default=None):
+        """
+        Look up a dotted path, e.g. config.path("logging.transactions.webhook").
+        """
+
+        node = self
+        for key in dotted.split("."):
+            if not isinstance(node, Mapping) or key not in node:
+                return default
+            node = node[key]
+        return node
+
+
+class ConfigSnapshot:
+    """
+    A validated, immutable snapshot of config.json and customconfig.json.
+
+    Values that are looked up on hot paths are worked out once here.
+    """
+
+    __slots__ = (
+        "config",
+        "custom",
+        "version",
+        "loaded_at",
+        "mode",
+        "prefix",
+        "devs",
+        "server_id",
+        "repo_url",
+        "transactions_webhook",
+        "paste_api",
+        "log_forward",
+        "color_role_ids",
+        "color_role_id_set",
+    )
+
+    def __init__(self, config: dict, custom: dict, version: int):
+        set_ = object.__setattr__
+
+        set_(self, "config", ConfigNode(config))
+        set_(self, "custom", ConfigNode(custom))
+        set_(self, "version", version)
+        set_(self, "loaded_at", datetime.now())
+
+        set_(self, "mode", self.config.mode)
+        set_(self, "prefix", self.config.bot.prefix)
+        set_(self, "devs", frozenset(self.config.devs))
+        set_(self, "server_id", self.config.get("server_id"))
+        set_(self, "repo_url", self.config.path("repo.url") or None)
+
+        set_(
+            self,
+            "transactions_webhook",
+            self.custom.path("logging.transactions.webhook"),
+        )
+        set_(self, "paste_api", self.custom.path("apis.zl_paste"))
+        set_(self, "log_forward", self.custom.path("logging.forward"))
+
+        colors = self.custom.path("color_cmd.colors") or ConfigNode({})
+        set_(self, "color_role_ids", colors)
+        set_(self, "color_role_id_set", frozenset(colors.values()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config snapshots are read-only.")
+
+    def is_dev(self, user_id: int) -> bool:
+        return user_id in self.devs
+
+
+def read_config_files() -> tuple[dict, dict]:
+    """
+    Read config.json and customconfig.json, blocking.
+    """
+
+    with open("config.json", "r") as f:
+        config = json.load(f)
+
+    custom = {}
+    if os.path.exists("customconfig.json"):
+        with open("customconfig.json", "r") as f:
+            custom = json.load(f)
+
+    return config, custom
+
+
+def config_mtimes() -> tuple:
+    return tuple(
+        os.path.getmtime(path) if os.path.exists(path) else None
+        for path in ("config.json", "customconfig.json")
+    )
+
+
+_snapshot = ConfigSnapshot(CONFIG, CUSTOM_CONFIG, 1)
+_subscribers: list = []
+
+
+def get_config() -> ConfigSnapshot:
+    """
+    The current config snapshot.
+
+    Don't hold on to it for longer than you need it, it's replaced when the config is reloaded.
+    """
+
+    return _snapshot
+
+
+def subscribe(callback) -> None:
+    """
+    Call callback(old, new) after the config is reloaded, it can be a coroutine function.
+
+    Cogs should subscribe in cog_load and unsubscribe in cog_unload.
+    """
+
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback) -> None:
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def load_snapshot() -> ConfigSnapshot:
+    """
+    Read and validate the config files into a new snapshot, blocking.
+
+    Raises ValueError if the config is invalid.
+    """
+
+    try:
+        config, custom = read_config_files()
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Failed to read the config files: {e}") from e
+
+    problems = validate_config(config)
+    if problems:
+        raise ValueError(" ".join(problems))
+
+    return ConfigSnapshot(config, custom, _snapshot.version + 1)
+
+
+async def reload_config() -> bool:
+    """
+    Reload the config files and swap in the new snapshot, then notify subscribers.
+
+    An invalid config is logged and ignored, the current snapshot stays in place.
+    Returns True if a new snapshot was swapped in.
+    """
+
+    global _snapshot
+
+    try:
+        new = await asyncio.to_thread(load_snapshot)
+    except ValueError as e:
+        RICKLOG_MAIN.error(f"Config reload rejected, keeping the current config: {e}")
+        return False
+
+    old = _snapshot
+    _snapshot = new
+
+    for key in RESTART_REQUIRED_KEYS:
+        if old.config.path(key) != new.config.path(key):
+            RICKLOG_MAIN.warning(
+                f"The '{key}' config changed, restart the bot to apply it."
+            )
+
+    RICKLOG_MAIN.info(f"Config reloaded (version {new.version}).")
+
+    for callback in list(_subscribers):
+        try:
+            result = callback(old, new)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            RICKLOG_MAIN.exception(f"Config subscriber {callback!r} failed: {e}")
+
+    return True
+
+
+async def watch_config(interval: float = CONFIG_WATCH_INTERVAL) -> None:
+    """
+    Reload the config whenever config.json or customconfig.json changes on disk.
+    """
+
+    last = await asyncio.to_thread(config_mtimes)
+
+    while True:
+        await asyncio.sleep(interval)
+
+        current = await asyncio.to_thread(config_mtimes)
+        if current != last:
+            last = current
+            await reload_config()
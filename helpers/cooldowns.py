@@ -0,0 +1,302 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for command cooldowns that survive restarts.
+
+@commands.cooldown lives in process memory, a restart resets it. @persistent_cooldown is a drop-in replacement:
+the running bot checks an in-memory cache (no database round trip), every cooldown started or reset is
+written to the cooldowns collection in the background, and on start-up the active cooldowns are loaded back.
+Other instances pick up changes every COOLDOWN_SYNC_INTERVAL.
+
+Expired cooldowns are dropped from memory as they are seen and removed from the collection by its TTL index.
+ctx.command.reset_cooldown(ctx) and CommandOnCooldown work exactly like they do with @commands.cooldown.
+"""
+
+# Import the required modules
+
+# Python standard library
+from datetime import datetime, timezone
+import asyncio
+import time
+
+# Third-party libraries
+from discord.ext import commands
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+# Helpers
+from helpers import db
+from helpers.logs import RICKLOG_BG
+
+# Constants
+
+# How often cooldowns started by other instances are pulled in (seconds)
+COOLDOWN_SYNC_INTERVAL = 15
+
+# How long a document is kept after its cooldown expires, so other instances see resets before it's deleted (seconds)
+COOLDOWN_TTL_GRACE = 300
+
+# Functions
+
+
+def persistent_cooldown(
+    name: str, per: float, type: commands.BucketType = commands.BucketType.user
+):
+    """
+    @commands.cooldown(1, per, type), stored in the database under name.
+
+    The name is part of the stored key, keep it stable (it doesn't have to match the command name).
+    """
+
+    def decorator(func):
+        mapping = PersistentCooldownMapping(COOLDOWNS, name, per, type)
+
+        if isinstance(func, commands.Command):
+            func._buckets = mapping
+        else:
+            func.__commands_cooldown__ = mapping
+
+        return func
+
+    return decorator
+
+
+# Classes
+
+
+class CooldownStore:
+    """
+    Cooldown expiry times keyed by (name, bucket key), as UNIX timestamps.
+    """
+
+    def __init__(self):
+        self.expires: dict[tuple, float] = {}
+
+        self._last_sync: datetime = None  # type: ignore
+        self._sync_task: asyncio.Task = None  # type: ignore
+        self._writes: set[asyncio.Task] = set()
+
+        # Writes are saved one at a time, in order, so a reset can't land before the trigger it undoes
+        self._write_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """
+        Create the indexes, load the active cooldowns and start syncing, from setup_hook.
+        """
+
+        await asyncio.to_thread(self.ensure_indexes)
+        await self.sync()
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    def ensure_indexes(self) -> None:
+        # The TTL index deletes documents once delete_at has passed
+        db.cooldowns_collection.create_index("delete_at", expireAfterSeconds=0)
+        db.cooldowns_collection.create_index([("updated_at", ASCENDING)])
+
+    async def close(self) -> None:
+        """
+        Stop syncing and wait for pending writes.
+        """
+
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def remaining(self, name: str, key) -> float:
+        """
+        Seconds left on a cooldown, 0.0 if it isn't active.
+        """
+
+        expires = self.expires.get((name, key))
+        if expires is None:
+            return 0.0
+
+        remaining = expires - time.time()
+        if remaining <= 0:
+            del self.expires[(name, key)]
+            return 0.0
+
+        return remaining
+
+    def trigger(self, name: str, key, per: float) -> None:
+        expires = time.time() + per
+        self.expires[(name, key)] = expires
+        self._write(name, key, expires)
+
+    def reset(self, name: str, key) -> None:
+        if self.expires.pop((name, key), None) is not None:
+            # Expire it rather than delete it so other instances see the reset
+            self._write(name, key, time.time())
+
+    def prune(self) -> int:
+        now = time.time()
+        expired = [key for key, expires in self.expires.items() if expires <= now]
+        for key in expired:
+            del self.expires[key]
+        return len(expired)
+
+    def _write(self, name: str, key, expires: float) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self._save_in_order(name, key, expires)
+            )
+        except RuntimeError:
+            # No event loop (e.g. a script), the in-memory cooldown still applies
+            return
+
+        self._writes.add(task)
+        task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task) -> None:
+        self._writes.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            RICKLOG_BG.error(f"Failed to save a cooldown: {task.exception()}")
+
+    async def _save_in_order(self, name: str, key, expires: float) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._save, name, key, expires)
+
+    def _save(self, name: str, key, expires: float) -> None:
+        db.cooldowns_collection.update_one(
+            {"_id": f"{name}:{key}"},
+            {
+                "$set": {
+                    "name": name,
+                    "key": key,
+                    "expires_at": datetime.fromtimestamp(expires, timezone.utc),
+                    "delete_at": datetime.fromtimestamp(
+                        expires + COOLDOWN_TTL_GRACE, timezone.utc
+                    ),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+
+    def _load(self, since: datetime | None) -> list:
+        query = {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+        if since is not None:
+            query = {"updated_at": {"$gt": since}}
+
+        return list(
+            db.cooldowns_collection.find(
+                query, {"name": 1, "key": 1, "expires_at": 1, "updated_at": 1}
+            )
+        )
+
+    async def sync(self) -> None:
+        """
+        Pull in cooldowns started or reset (by any instance) since the last sync.
+        """
+
+        documents = await asyncio.to_thread(self._load, self._last_sync)
+
+        for document in documents:
+            expires_at = document["expires_at"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+            # Compound bucket keys come back from MongoDB as lists
+            bucket_key = document["key"]
+            if isinstance(bucket_key, list):
+                bucket_key = tuple(bucket_key)
+
+            key = (document["name"], bucket_key)
+            expires = expires_at.timestamp()
+
+            if expires > time.time():
+                # Never shorten a cooldown this instance started more recently
+                self.expires[key] = max(self.expires.get(key, 0.0), expires)
+            else:
+                self.expires.pop(key, None)
+
+            updated_at = document["updated_at"]
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            if self._last_sync is None or updated_at > self._last_sync:
+                self._last_sync = updated_at
+
+        if self._last_sync is None:
+            self._last_sync = datetime.now(timezone.utc)
+
+        self.prune()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(COOLDOWN_SYNC_INTERVAL)
+
+            try:
+                await self.sync()
+            except PyMongoError as e:
+                RICKLOG_BG.warning(f"Failed to sync cooldowns: {e}")
+
+
+class PersistentCooldown(commands.Cooldown):
+    """
+    A Cooldown bucket backed by the CooldownStore, one per (name, key).
+    """
+
+    def __init__(self, store: CooldownStore, name: str, key, per: float):
+        super().__init__(1, per)
+
+        self.store = store
+        self.name = name
+        self.key = key
+
+    def get_tokens(self, current: float | None = None) -> int:
+        return 0 if self.store.remaining(self.name, self.key) else 1
+
+    def get_retry_after(self, current: float | None = None) -> float:
+        return self.store.remaining(self.name, self.key)
+
+    def update_rate_limit(
+        self, current: float | None = None, *, tokens: int = 1
+    ) -> float | None:
+        remaining = self.store.remaining(self.name, self.key)
+        if remaining:
+            return remaining
+
+        self.store.trigger(self.name, self.key, self.per)
+        return None
+
+    def reset(self) -> None:
+        self.store.reset(self.name, self.key)
+
+    def copy(self) -> "PersistentCooldown":
+        return PersistentCooldown(self.store, self.name, self.key, self.per)
+
+
+class PersistentCooldownMapping(commands.CooldownMapping):
+    """
+    CooldownMapping handing out PersistentCooldown buckets.
+    """
+
+    def __init__(
+        self,
+        store: CooldownStore,
+        name: str,
+        per: float,
+        type: commands.BucketType = commands.BucketType.user,
+    ):
+        super().__init__(commands.Cooldown(1, per), type)
+
+        self.store = store
+        self.name = name
+        self.per = per
+
+    def copy(self) -> "PersistentCooldownMapping":
+        # The state lives in the store, copies can share it
+        return self
+
+    def get_bucket(self, message, current: float | None = None) -> PersistentCooldown:
+        return PersistentCooldown(
+            self.store, self.name, self._bucket_key(message), self.per
+        )
+
+
+# The store used by the bot
+COOLDOWNS = CooldownStore()
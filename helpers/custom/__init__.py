@@ -1,18 +1,9 @@
-"""
-(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
-You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
-
-The helpers module contains all the custom helper functions and classes used custom cog files.
-"""
-
-"""Import all modules that exist in the current directory."""
-# Ref https://stackoverflow.com/a/60861023/
-from importlib import import_module
-from pathlib import Path
-
-for f in Path(__file__).parent.glob("*.py"):
-    module_name = f.stem
-    if (not module_name.startswith("_")) and (module_name not in globals()):
-        import_module(f".{module_name}", __package__)
-    del f, module_name
-del (import_module,)
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+The helpers module contains all the custom helper functions and classes used custom cog files.
+"""
+
+# Helper modules are imported explicitly where they are used (e.g. from helpers.db import ...),
+# importing the package alone doesn't import (or connect) anything.
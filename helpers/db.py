@@ -3,25 +3,88 @@
 You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
 
 This is the database file for the AR15 website. It contains the database connection logic.
+
+The MongoClient is created on first use rather than at import time, so importing this module is cheap.
+The client and collections are module attributes resolved through __getattr__,
+`from helpers.db import money_collection` keeps working and connects at that point.
 """
 
 # Import the required modules
 
-# Third Party Modules
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+# Python standard library
+import threading
 
 # Import configuration
-from helpers.config import CONFIG
+from helpers.config import get_config
+
+# Constants
+
+BOT_DB_NAME = "bot"
 
-client = MongoClient(CONFIG["mongo"]["uri"], server_api=ServerApi("1"))
+# Module attribute -> collection name
+COLLECTIONS = {
+    "messages_collection": "messages",
+    "money_collection": "money",
+    "invites_collection": "invites",
+    "users_collection": "users",
+    "ledger_collection": "ledger",
+    "state_collection": "state",
+    "cooldowns_collection": "cooldowns",
+}
 
-bot_db = client["bot"]
-messages_collection = bot_db["messages"]
-money_collection = bot_db["money"]
-invites_collection = bot_db["invites"]
-users_collection = bot_db["users"]
+_client = None
+_client_lock = threading.Lock()
 
 
 def get_mongo_client():
-    return client
+    """
+    Get the shared MongoClient, creating it on first use.
+
+    Creating the client can block (e.g. resolving a mongodb+srv URI), so the first call should be made from a thread.
+    """
+
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Third Party Modules
+                from pymongo.mongo_client import MongoClient
+                from pymongo.server_api import ServerApi
+
+                # Helpers
+                from helpers.metrics import MongoCommandMetrics
+
+                _client = MongoClient(
+                    get_config().config.mongo.uri,
+                    server_api=ServerApi("1"),
+                    event_listeners=[MongoCommandMetrics()],
+                )
+
+    return _client
+
+
+def close_mongo_client() -> None:
+    """
+    Close the shared MongoClient if it was ever created, blocking.
+    """
+
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def __getattr__(name: str):
+    if name == "client":
+        return get_mongo_client()
+
+    if name == "bot_db":
+        return get_mongo_client()[BOT_DB_NAME]
+
+    if name in COLLECTIONS:
+        return get_mongo_client()[BOT_DB_NAME][COLLECTIONS[name]]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,416 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for storing error reports.
+
+Every error fingerprint gets one row in a small SQLite index (errors/errors.db) and one
+Brotli compressed report in errors/archive. Counting unchecked errors is a single indexed query,
+old and oversized archives are pruned, and checked errors are acknowledged instead of deleted by hand.
+
+Everything in here blocks, call it from a thread.
+"""
+
+# Import the required modules
+
+# Python standard library
+from datetime import datetime, timedelta
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+# Third-party libraries
+import brotli
+
+# Helpers
+from helpers.logs import RICKLOG_MAIN
+
+# Constants
+
+ERROR_DIR = "errors"
+ERROR_ARCHIVE_DIR = os.path.join(ERROR_DIR, "archive")
+ERROR_STORE_PATH = os.path.join(ERROR_DIR, "errors.db")
+
+# The JSON index used before the SQLite store, migrated on first open
+ERROR_LEGACY_INDEX = os.path.join(ERROR_DIR, "fingerprints.json")
+
+# Number of sample contexts kept for each fingerprint
+ERROR_FINGERPRINT_SAMPLES = 5
+
+# Fingerprints not seen for this long are deleted (days)
+ERROR_RETENTION_DAYS = 30
+
+# Total size the compressed archive may grow to before the oldest reports are deleted (bytes)
+ERROR_ARCHIVE_MAX_BYTES = 50 * 1024 * 1024
+
+# The store is pruned after this many recorded errors, as well as on a schedule (see ErrorReporter)
+ERROR_PRUNE_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    exc_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    samples TEXT NOT NULL DEFAULT '[]',
+    archive TEXT,
+    archive_size INTEGER NOT NULL DEFAULT 0,
+    paste_link TEXT,
+    pasted_at TEXT,
+    acknowledged INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS fingerprints_acknowledged ON fingerprints (acknowledged);
+CREATE INDEX IF NOT EXISTS fingerprints_last_seen ON fingerprints (last_seen);
+CREATE INDEX IF NOT EXISTS fingerprints_count ON fingerprints (count);
+"""
+
+# Classes
+
+
+class ErrorFingerprint:
+    """
+    Everything we know about one kind of error.
+    """
+
+    __slots__ = (
+        "fingerprint",
+        "exc_type",
+        "message",
+        "count",
+        "first_seen",
+        "last_seen",
+        "samples",
+        "archive",
+        "archive_size",
+        "paste_link",
+        "pasted_at",
+        "acknowledged",
+    )
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "ErrorFingerprint":
+        self = cls()
+        self.fingerprint = row["fingerprint"]
+        self.exc_type = row["exc_type"]
+        self.message = row["message"]
+        self.count = row["count"]
+        self.first_seen = datetime.fromisoformat(row["first_seen"])
+        self.last_seen = datetime.fromisoformat(row["last_seen"])
+        self.samples = json.loads(row["samples"])
+        self.archive = row["archive"]
+        self.archive_size = row["archive_size"]
+        self.paste_link = row["paste_link"]
+        self.pasted_at = (
+            datetime.fromisoformat(row["pasted_at"]) if row["pasted_at"] else None
+        )
+        self.acknowledged = bool(row["acknowledged"])
+        return self
+
+
+class ErrorStore:
+    """
+    The SQLite index and compressed archive of error reports.
+
+    A fingerprint that is acknowledged and then seen again becomes unchecked again.
+    """
+
+    def __init__(self, path: str = ERROR_STORE_PATH):
+        self.path = path
+
+        self._db = None
+        self._lock = threading.Lock()
+
+        # Errors recorded since the last prune
+        self._since_prune = 0
+
+    def open(self) -> None:
+        """
+        Open the database, create the schema and migrate any legacy reports.
+        """
+
+        os.makedirs(ERROR_ARCHIVE_DIR, exist_ok=True)
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+
+        self.migrate_legacy()
+        self.prune()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def record(
+        self,
+        fingerprint: str,
+        exc_type: str,
+        message: str,
+        context: dict,
+        content: str,
+    ) -> ErrorFingerprint:
+        """
+        Count an occurrence of a fingerprint, archiving the report if it is the first one.
+        """
+
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            row = self._get(fingerprint)
+
+            if row is None:
+                archive, size = self._archive(fingerprint, content)
+                self._db.execute(
+                    "INSERT INTO fingerprints (fingerprint, exc_type, message, count, first_seen, "
+                    "last_seen, samples, archive, archive_size) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)",
+                    (
+                        fingerprint,
+                        exc_type,
+                        message,
+                        now,
+                        now,
+                        json.dumps([context], default=str),
+                        archive,
+                        size,
+                    ),
+                )
+            else:
+                samples = json.loads(row["samples"])[-(ERROR_FINGERPRINT_SAMPLES - 1) :]
+                samples.append(context)
+
+                self._db.execute(
+                    "UPDATE fingerprints SET count = count + 1, last_seen = ?, samples = ?, "
+                    "acknowledged = 0 WHERE fingerprint = ?",
+                    (now, json.dumps(samples, default=str), fingerprint),
+                )
+
+            self._db.commit()
+
+            entry = ErrorFingerprint.from_row(self._get(fingerprint))
+
+            self._since_prune += 1
+            due = self._since_prune >= ERROR_PRUNE_EVERY
+
+        if due:
+            self.prune()
+
+        return entry
+
+    def set_paste(self, fingerprint: str, paste_link: str | None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE fingerprints SET paste_link = COALESCE(?, paste_link), pasted_at = ? "
+                "WHERE fingerprint = ?",
+                (
+                    paste_link,
+                    datetime.now().isoformat() if paste_link else None,
+                    fingerprint,
+                ),
+            )
+            self._db.commit()
+
+    def get(self, fingerprint: str) -> ErrorFingerprint | None:
+        with self._lock:
+            row = self._get(fingerprint)
+
+        return ErrorFingerprint.from_row(row) if row else None
+
+    def read(self, fingerprint: str) -> str | None:
+        """
+        The full report for a fingerprint, decompressed.
+        """
+
+        entry = self.get(fingerprint)
+        if entry is None or entry.archive is None:
+            return None
+
+        try:
+            with open(entry.archive, "rb") as f:
+                return brotli.decompress(f.read()).decode()
+        except (OSError, brotli.error):
+            return None
+
+    def top(self, limit: int = 10, *, unchecked_only: bool = False) -> list:
+        """
+        The most frequent fingerprints.
+        """
+
+        query = "SELECT * FROM fingerprints"
+        if unchecked_only:
+            query += " WHERE acknowledged = 0"
+        query += " ORDER BY count DESC LIMIT ?"
+
+        with self._lock:
+            rows = self._db.execute(query, (limit,)).fetchall()
+
+        return [ErrorFingerprint.from_row(row) for row in rows]
+
+    def unchecked_count(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM fingerprints WHERE acknowledged = 0"
+            ).fetchone()[0]
+
+    def acknowledge(self, fingerprint: str | None = None) -> int:
+        """
+        Mark a fingerprint as checked, or every fingerprint if none is given.
+
+        Returns the number of fingerprints acknowledged.
+        """
+
+        with self._lock:
+            if fingerprint is None:
+                cursor = self._db.execute(
+                    "UPDATE fingerprints SET acknowledged = 1 WHERE acknowledged = 0"
+                )
+            else:
+                cursor = self._db.execute(
+                    "UPDATE fingerprints SET acknowledged = 1 WHERE fingerprint = ? AND acknowledged = 0",
+                    (fingerprint,),
+                )
+            self._db.commit()
+
+            return cursor.rowcount
+
+    def prune(self) -> int:
+        """
+        Delete fingerprints past the retention period, then the oldest ones
+        (acknowledged first) until the archive fits in ERROR_ARCHIVE_MAX_BYTES.
+
+        Returns the number of fingerprints deleted.
+        """
+
+        cutoff = (datetime.now() - timedelta(days=ERROR_RETENTION_DAYS)).isoformat()
+
+        with self._lock:
+            self._since_prune = 0
+
+            expired = self._db.execute(
+                "SELECT fingerprint, archive FROM fingerprints WHERE last_seen < ?",
+                (cutoff,),
+            ).fetchall()
+
+            total = self._db.execute(
+                "SELECT COALESCE(SUM(archive_size), 0) FROM fingerprints WHERE last_seen >= ?",
+                (cutoff,),
+            ).fetchone()[0]
+
+            oversized = []
+            if total > ERROR_ARCHIVE_MAX_BYTES:
+                for row in self._db.execute(
+                    "SELECT fingerprint, archive, archive_size FROM fingerprints WHERE last_seen >= ? "
+                    "ORDER BY acknowledged DESC, last_seen ASC",
+                    (cutoff,),
+                ):
+                    if total <= ERROR_ARCHIVE_MAX_BYTES:
+                        break
+                    oversized.append(row)
+                    total -= row["archive_size"]
+
+            deleted = expired + oversized
+
+            for row in deleted:
+                if row["archive"]:
+                    try:
+                        os.remove(row["archive"])
+                    except FileNotFoundError:
+                        pass
+
+            self._db.executemany(
+                "DELETE FROM fingerprints WHERE fingerprint = ?",
+                [(row["fingerprint"],) for row in deleted],
+            )
+            self._db.commit()
+
+        if deleted:
+            RICKLOG_MAIN.info(f"Pruned {len(deleted)} old error report(s).")
+
+        return len(deleted)
+
+    def migrate_legacy(self) -> int:
+        """
+        Move plain text reports and the old JSON index into the store.
+
+        Legacy reports without a fingerprint are keyed by their file name and left unchecked.
+        Returns the number of reports migrated.
+        """
+
+        migrated = 0
+
+        legacy_index = {}
+        if os.path.exists(ERROR_LEGACY_INDEX):
+            try:
+                with open(ERROR_LEGACY_INDEX, "r") as f:
+                    legacy_index = json.load(f)
+            except (OSError, ValueError) as e:
+                RICKLOG_MAIN.error(f"Failed to read the legacy error index: {e}")
+
+        for path in glob.glob(os.path.join(ERROR_DIR, "*.txt")):
+            fingerprint = os.path.splitext(os.path.basename(path))[0]
+
+            try:
+                with open(path, "r", errors="replace") as f:
+                    content = f.read()
+                mtime = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            except OSError as e:
+                RICKLOG_MAIN.error(f"Failed to migrate error report {path}: {e}")
+                continue
+
+            entry = legacy_index.pop(fingerprint, {})
+
+            with self._lock:
+                if self._get(fingerprint) is None:
+                    archive, size = self._archive(fingerprint, content)
+                    self._db.execute(
+                        "INSERT INTO fingerprints (fingerprint, exc_type, message, count, first_seen, "
+                        "last_seen, samples, archive, archive_size, paste_link, pasted_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            fingerprint,
+                            entry.get("exc_type", "Unknown"),
+                            entry.get("message", ""),
+                            entry.get("count", 1),
+                            entry.get("first_seen", mtime),
+                            entry.get("last_seen", mtime),
+                            json.dumps(entry.get("samples", [])),
+                            archive,
+                            size,
+                            entry.get("paste_link"),
+                            entry.get("pasted_at"),
+                        ),
+                    )
+                    self._db.commit()
+
+            os.remove(path)
+            migrated += 1
+
+        if os.path.exists(ERROR_LEGACY_INDEX):
+            os.remove(ERROR_LEGACY_INDEX)
+
+        if migrated:
+            RICKLOG_MAIN.info(f"Migrated {migrated} legacy error report(s).")
+
+        return migrated
+
+    def _get(self, fingerprint: str):
+        return self._db.execute(
+            "SELECT * FROM fingerprints WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+
+    def _archive(self, fingerprint: str, content: str) -> tuple:
+        path = os.path.join(ERROR_ARCHIVE_DIR, f"{fingerprint}.txt.br")
+
+        try:
+            data = brotli.compress(content.encode(), quality=9)
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            RICKLOG_MAIN.error(f"Failed to archive error report {fingerprint}: {e}")
+            return None, 0
+
+        return path, len(data)
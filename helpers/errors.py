@@ -8,47 +8,306 @@ This is a helper for handling all discord.py related errors.
 # Import the required modules
 
 # Python standard library
-from datetime import datetime
-from requests.auth import HTTPBasicAuth
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
 import os
 import random
-import requests
+import sqlite3
 import string
 import traceback
 
 # Third-party libraries
+import aiohttp
 import discord
 from discord.ext import commands
 
 # Helper functions
 from helpers.colors import ERROR_EMBED_COLOR
+from helpers.error_store import ErrorStore
 from helpers.logs import RICKLOG_MAIN
 
 # Config
-from helpers.config import CUSTOM_CONFIG
+from helpers.config import get_config
 
+# Constants
 
-def upload_to_paste(error_file_path):
-    base_url = CUSTOM_CONFIG["apis"]["zl_paste"]["url"]
-    paste_route = CUSTOM_CONFIG["apis"]["zl_paste"]["routes"]["paste"]
-    auth = CUSTOM_CONFIG["apis"]["zl_paste"]["auth"]
-    documents_url = f"{base_url}{paste_route}"
+# Number of error reports written and uploaded at the same time
+ERROR_REPORT_WORKERS = 2
+
+# Maximum number of error reports waiting to be processed
+ERROR_REPORT_QUEUE_SIZE = 100
+
+# How long a paste upload may take before it is abandoned (seconds)
+ERROR_PASTE_TIMEOUT = 10
+
+# Minimum time between paste uploads for the same fingerprint (seconds)
+ERROR_PASTE_INTERVAL = 3600
+
+# How often the error store is pruned of old and oversized reports (seconds)
+ERROR_PRUNE_INTERVAL = 3600
+
+ERROR_REPORT_HEADER = (
+    "Hello! An error occurred during the running of RickBot.\nThis is most likely a serious error, "
+    "so please investigate it.\nIf you find this errors has occurred due to an issue with the original "
+    "code, please contact the developer.\nOtherwise, you're on your own. Good luck!\n\n"
+)
 
-    with open(error_file_path, "r") as file:
-        content = file.read()
 
-    response = requests.post(
+async def upload_to_paste(session: aiohttp.ClientSession, content: str):
+    paste_api = get_config().paste_api
+
+    try:
+        base_url = paste_api["url"]
+        paste_route = paste_api["routes"]["paste"]
+        auth = paste_api["auth"]
+    except (KeyError, TypeError):
+        RICKLOG_MAIN.warning("No paste API configured. Not uploading the error log.")
+        return None
+
+    documents_url = f"{base_url}{paste_route}"
+
+    async with session.post(
         documents_url,
         data=content,
-        auth=HTTPBasicAuth(auth["username"], auth["password"]),
+        auth=aiohttp.BasicAuth(auth["username"], auth["password"]),
+        timeout=aiohttp.ClientTimeout(total=ERROR_PASTE_TIMEOUT),
+    ) as response:
+        if response.status == 200:
+            data = await response.json(content_type=None)
+            return f"{base_url}/{data['key']}"
+        else:
+            RICKLOG_MAIN.critical(f"Failed to upload to Paste: {response.status}")
+            RICKLOG_MAIN.exception(await response.text())
+            return None
+
+
+def fingerprint_error(error: Exception) -> str:
+    """
+    Fingerprint an error by its exception type and normalized traceback frames.
+
+    Frames are reduced to file name and function name, so line numbers shifting
+    (or the error message changing) doesn't create a new fingerprint.
+    """
+
+    original = getattr(error, "original", error)
+
+    parts = [f"{type(original).__module__}.{type(original).__qualname__}"]
+    for frame in traceback.extract_tb(original.__traceback__):
+        parts.append(f"{os.path.basename(frame.filename)}:{frame.name}")
+
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:12]
+
+
+class ErrorReport:
+    __slots__ = (
+        "error_id",
+        "fingerprint",
+        "exc_type",
+        "message",
+        "content",
+        "context",
+        "reply",
     )
 
-    if response.status_code == 200:
-        return f"{base_url}/{response.json()['key']}"
-    else:
-        RICKLOG_MAIN.critical(f"Failed to upload to Paste: {response.status_code}")
-        RICKLOG_MAIN.exception(response.text)
-        return None
+    def __init__(
+        self,
+        error_id: str,
+        fingerprint: str,
+        exc_type: str,
+        message: str,
+        content: str,
+        context: dict,
+        reply: discord.Message | None,
+    ):
+        self.error_id = error_id
+        self.fingerprint = fingerprint
+        self.exc_type = exc_type
+        self.message = message
+        self.content = content
+        self.context = context
+        self.reply = reply
+
+
+class ErrorReporter:
+    """
+    Records error reports in the error store and uploads them to paste in the background.
+
+    Reports are deduplicated by fingerprint: only the first occurrence is archived,
+    later ones just bump the counters and keep a few sample contexts.
+    Paste uploads happen at most once per ERROR_PASTE_INTERVAL for each fingerprint.
+
+    Once the upload finishes the paste link is edited into the reply the user already got.
+    """
+
+    def __init__(self, bot, *, workers: int = ERROR_REPORT_WORKERS):
+        self.bot = bot
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=ERROR_REPORT_QUEUE_SIZE)
+        self.worker_count = workers
+
+        self.store = ErrorStore()
+
+        self.dropped = 0
+
+        self._workers: list[asyncio.Task] = []
+        self._pruner: asyncio.Task = None  # type: ignore
+
+        # Fingerprints with an upload in progress, so two workers don't upload the same error
+        self._uploading: set[str] = set()
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.store.open)
+
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        self._pruner = asyncio.create_task(self._prune_loop())
+
+    async def top(self, limit: int = 10) -> list:
+        """
+        The most frequent fingerprints.
+        """
+
+        return await asyncio.to_thread(self.store.top, limit)
+
+    async def unchecked_count(self) -> int:
+        """
+        The number of fingerprints that haven't been acknowledged.
+        """
+
+        return await asyncio.to_thread(self.store.unchecked_count)
+
+    async def acknowledge(self, fingerprint: str | None = None) -> int:
+        """
+        Mark a fingerprint (or every fingerprint) as checked.
+        """
+
+        return await asyncio.to_thread(self.store.acknowledge, fingerprint)
+
+    def submit(self, report: ErrorReport) -> bool:
+        """
+        Queue a report, never blocks.
+
+        Returns False if the queue is full.
+        """
+
+        try:
+            self.queue.put_nowait(report)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            RICKLOG_MAIN.error(
+                f"Error report queue is full, dropping report {report.error_id}."
+            )
+            return False
+
+        return True
+
+    async def close(self, timeout: float = 10.0) -> int:
+        """
+        Wait for queued reports to be processed, then stop the workers.
+
+        Returns the number of reports left unprocessed.
+        """
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for task in self._workers:
+            task.cancel()
+
+        if self._pruner is not None:
+            self._pruner.cancel()
+
+        await asyncio.to_thread(self.store.close)
+
+        return self.queue.qsize()
+
+    async def _worker(self) -> None:
+        while True:
+            report: ErrorReport = await self.queue.get()
+
+            try:
+                await self._process(report)
+            except Exception as e:
+                RICKLOG_MAIN.exception(
+                    f"Failed to process error report {report.error_id}: {e}"
+                )
+            finally:
+                self.queue.task_done()
+
+    async def _prune_loop(self) -> None:
+        # Enforces the retention period even when few errors are recorded
+        while True:
+            await asyncio.sleep(ERROR_PRUNE_INTERVAL)
+
+            try:
+                await asyncio.to_thread(self.store.prune)
+            except sqlite3.Error as e:
+                RICKLOG_MAIN.error(f"Failed to prune the error store: {e}")
+
+    async def _process(self, report: ErrorReport) -> None:
+        entry = await asyncio.to_thread(
+            self.store.record,
+            report.fingerprint,
+            report.exc_type,
+            report.message,
+            report.context,
+            report.content,
+        )
+
+        if entry.count == 1:
+            RICKLOG_MAIN.error(f"Error log archived at {entry.archive}")
+        else:
+            RICKLOG_MAIN.error(
+                f"Error {report.fingerprint} seen {entry.count} times, log at {entry.archive}"
+            )
+
+        paste_link = entry.paste_link
+
+        # Reuse the last paste for this fingerprint unless it's due another upload
+        due = entry.pasted_at is None or (
+            datetime.now() - entry.pasted_at
+        ) >= timedelta(seconds=ERROR_PASTE_INTERVAL)
+
+        if due and report.fingerprint not in self._uploading:
+            self._uploading.add(report.fingerprint)
+
+            try:
+                paste_link = (
+                    await upload_to_paste(self.bot.session, report.content)
+                    or paste_link
+                )
+
+                if paste_link != entry.paste_link:
+                    await asyncio.to_thread(
+                        self.store.set_paste, report.fingerprint, paste_link
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                RICKLOG_MAIN.error(f"Failed to upload to Paste: {e}")
+            finally:
+                self._uploading.discard(report.fingerprint)
+
+        RICKLOG_MAIN.error(f"Paste link: {paste_link}")
+
+        if not paste_link or report.reply is None or not report.reply.embeds:
+            return
+
+        embed = report.reply.embeds[0]
+        embed.add_field(
+            name="Error Log",
+            value=f"[View as Paste]({paste_link})",
+            inline=False,
+        )
+
+        try:
+            await report.reply.edit(embed=embed)
+        except discord.HTTPException as e:
+            RICKLOG_MAIN.warning(
+                f"Failed to add the paste link to the error reply: {e}"
+            )
 
 
 async def handle_error(ctx: commands.Context, error: Exception):
@@ -149,60 +408,48 @@ async def handle_error(ctx: commands.Context, error: Exception):
 
         embed.set_footer(text="RickBot Error Logging")
 
-        # This is a serious error, log it in the errors directory
+        reply = await ctx.reply(embed=embed, mention_author=False)
 
-        # Ensure the errors directory exists
-        if not os.path.exists("errors"):
-            RICKLOG_MAIN.warning(
-                "The errors directory does not exist; creating it now."
-            )
-            try:
-                os.makedirs("errors")
-            except Exception as e:
-                RICKLOG_MAIN.error(
-                    f"An error occurred while creating the errors directory: {e}\nNo error log will be created."
-                )
-                return
+        RICKLOG_MAIN.error(f"An error occurred while running the command: {error}")
 
-        # Log the error
-        error_file = (
-            f"errors/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}-{error_id}.txt"
+        # This is a serious error, log it in the errors directory
+        # Writing the file and uploading it happens in the background
+        original = getattr(error, "original", error)
+        fingerprint = fingerprint_error(error)
+
+        content = (
+            ERROR_REPORT_HEADER
+            + f"Error: {error}\n"
+            + f"Error ID: {error_id}\n"
+            + f"Fingerprint: {fingerprint}\n"
+            + f"Command: {ctx.command}\n"
+            + f"Author: {ctx.author}\n"
+            + f"Message: {ctx.message.content}\n"
+            + f"Guild: {ctx.guild}\n"
+            + f"Channel: {ctx.channel}\n"
+            + f"Time: {datetime.now()}\n"
+            + "\n\n----------------------------------------------------\nTraceback\n"
+            "----------------------------------------------------\n\n\n"
+            + "".join(traceback.format_tb(original.__traceback__))
         )
 
-        with open(error_file, "w+") as f:
-            f.write(
-                "Hello! An error occurred during the running of RickBot.\nThis is most likely a serious error, "
-                "so please investigate it.\nIf you find this errors has occurred due to an issue with the original "
-                "code, please contact the developer.\nOtherwise, you're on your own. Good luck!\n\n"
-            )
-            f.write(f"Error: {error}\n")
-            f.write(f"Error ID: {error_id}\n")
-            f.write(f"Command: {ctx.command}\n")
-            f.write(f"Author: {ctx.author}\n")
-            f.write(f"Message: {ctx.message.content}\n")
-            f.write(f"Guild: {ctx.guild}\n")
-            f.write(f"Channel: {ctx.channel}\n")
-            f.write(f"Time: {datetime.now()}\n")
-            f.write(
-                "\n\n----------------------------------------------------\nTraceback\n"
-                "----------------------------------------------------\n\n\n"
-            )
-
-            tb = traceback.format_tb(error.original.__traceback__)
-            tb = "".join(tb)
-            f.write(tb)
-
-        paste_link = upload_to_paste(error_file)
-
-        if paste_link:
-            embed.add_field(
-                name="Error Log",
-                value=f"[View as Paste]({paste_link})",
-                inline=False,
+        context = {
+            "error_id": error_id,
+            "error": str(error),
+            "command": str(ctx.command),
+            "author": str(ctx.author),
+            "channel": str(ctx.channel),
+            "time": datetime.now().isoformat(),
+        }
+
+        ctx.bot.error_reporter.submit(
+            ErrorReport(
+                error_id,
+                fingerprint,
+                type(original).__name__,
+                str(original),
+                content,
+                context,
+                reply,
             )
-
-        await ctx.reply(embed=embed, mention_author=False)
-
-        RICKLOG_MAIN.error(f"An error occurred while running the command: {error}")
-        RICKLOG_MAIN.error(f"Error log created at {error_file}")
-        RICKLOG_MAIN.error(f"Paste link: {paste_link}")
+        )
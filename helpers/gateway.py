@@ -0,0 +1,551 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for the gateway settings: intents, member cache flags, guild chunking and the message cache.
+
+Everything is driven by the optional "gateway" section of config.json, for example
+    "gateway": {
+        "intents": {"presences": false, "guild_typing": false},
+        "member_cache": {"joined": true, "voice": false},
+        "chunk_guilds_at_startup": true,
+        "max_messages": 100,
+        "record": {"path": "gateway.jsonl", "limit": 50000}
+    }
+
+"record" writes raw gateway events to a file so they can be replayed against different settings,
+run this file to compare memory and CPU use (see the bottom of this file).
+Recordings contain message content and user data, don't keep them around.
+"""
+
+# Import the required modules
+
+# Python standard library
+import asyncio
+import json
+
+# Third-party libraries
+import discord
+
+# Helpers
+from helpers.logs import RICKLOG_DISCORD
+
+# Constants
+
+# Nothing uses presences, typing, voice states or the moderation events,
+# guild reactions are needed for the confirmation prompts (wait_for("reaction_add") in !transfer and cleanup)
+DEFAULT_INTENTS = {
+    "guilds": True,
+    "members": True,
+    "moderation": False,
+    "emojis_and_stickers": False,
+    "integrations": False,
+    "webhooks": True,
+    "invites": True,
+    "voice_states": False,
+    "presences": False,
+    "guild_messages": True,
+    "dm_messages": True,
+    "guild_reactions": True,
+    "dm_reactions": False,
+    "guild_typing": False,
+    "dm_typing": False,
+    "message_content": True,
+    "guild_scheduled_events": False,
+    "auto_moderation_configuration": False,
+    "auto_moderation_execution": False,
+}
+
+DEFAULT_MEMBER_CACHE = {"joined": True, "voice": False}
+
+DEFAULT_CHUNK_GUILDS_AT_STARTUP = True
+
+# Full Message objects cached by discord.py, only needed for things like reactions on recent messages
+DEFAULT_MAX_MESSAGES = 100
+
+# Maximum number of gateway events recorded when recording is enabled
+DEFAULT_RECORD_LIMIT = 50_000
+
+# Listener -> intents it needs (any one of them is enough)
+LISTENER_INTENTS = {
+    "on_message": ("guild_messages", "dm_messages"),
+    "on_message_edit": ("guild_messages", "dm_messages"),
+    "on_message_delete": ("guild_messages", "dm_messages"),
+    "on_bulk_message_delete": ("guild_messages",),
+    "on_raw_message_edit": ("guild_messages", "dm_messages"),
+    "on_raw_message_delete": ("guild_messages", "dm_messages"),
+    "on_raw_bulk_message_delete": ("guild_messages",),
+    "on_reaction_add": ("guild_reactions", "dm_reactions"),
+    "on_reaction_remove": ("guild_reactions", "dm_reactions"),
+    "on_reaction_clear": ("guild_reactions", "dm_reactions"),
+    "on_raw_reaction_add": ("guild_reactions", "dm_reactions"),
+    "on_raw_reaction_remove": ("guild_reactions", "dm_reactions"),
+    "on_typing": ("guild_typing", "dm_typing"),
+    "on_raw_typing": ("guild_typing", "dm_typing"),
+    "on_presence_update": ("presences",),
+    "on_member_join": ("members",),
+    "on_member_remove": ("members",),
+    "on_member_update": ("members",),
+    "on_raw_member_remove": ("members",),
+    "on_user_update": ("members",),
+    "on_member_ban": ("moderation",),
+    "on_member_unban": ("moderation",),
+    "on_audit_log_entry_create": ("moderation",),
+    "on_invite_create": ("invites",),
+    "on_invite_delete": ("invites",),
+    "on_webhooks_update": ("webhooks",),
+    "on_voice_state_update": ("voice_states",),
+    "on_guild_emojis_update": ("emojis_and_stickers",),
+    "on_guild_stickers_update": ("emojis_and_stickers",),
+    "on_integration_create": ("integrations",),
+    "on_integration_update": ("integrations",),
+    "on_scheduled_event_create": ("guild_scheduled_events",),
+    "on_scheduled_event_delete": ("guild_scheduled_events",),
+    "on_scheduled_event_update": ("guild_scheduled_events",),
+}
+
+# Gateway event -> intents Discord needs before it sends it (any one of them is enough)
+EVENT_INTENTS = {
+    "MESSAGE_CREATE": ("guild_messages", "dm_messages"),
+    "MESSAGE_UPDATE": ("guild_messages", "dm_messages"),
+    "MESSAGE_DELETE": ("guild_messages", "dm_messages"),
+    "MESSAGE_DELETE_BULK": ("guild_messages",),
+    "MESSAGE_REACTION_ADD": ("guild_reactions", "dm_reactions"),
+    "MESSAGE_REACTION_REMOVE": ("guild_reactions", "dm_reactions"),
+    "MESSAGE_REACTION_REMOVE_ALL": ("guild_reactions", "dm_reactions"),
+    "TYPING_START": ("guild_typing", "dm_typing"),
+    "PRESENCE_UPDATE": ("presences",),
+    "GUILD_MEMBER_ADD": ("members",),
+    "GUILD_MEMBER_UPDATE": ("members",),
+    "GUILD_MEMBER_REMOVE": ("members",),
+    "GUILD_BAN_ADD": ("moderation",),
+    "GUILD_BAN_REMOVE": ("moderation",),
+    "INVITE_CREATE": ("invites",),
+    "INVITE_DELETE": ("invites",),
+    "WEBHOOKS_UPDATE": ("webhooks",),
+    "VOICE_STATE_UPDATE": ("voice_states",),
+    "GUILD_EMOJIS_UPDATE": ("emojis_and_stickers",),
+    "GUILD_STICKERS_UPDATE": ("emojis_and_stickers",),
+}
+
+# Functions
+
+
+def build_intents(config) -> discord.Intents:
+    """
+    The intents to connect with, DEFAULT_INTENTS overridden by gateway.intents.
+    """
+
+    flags = dict(DEFAULT_INTENTS)
+    flags.update(config.get("intents", {}))
+
+    return discord.Intents(**flags)
+
+
+def build_member_cache_flags(
+    config, intents: discord.Intents
+) -> discord.MemberCacheFlags:
+    """
+    The member cache flags, only flags the intents allow are kept.
+    """
+
+    flags = dict(DEFAULT_MEMBER_CACHE)
+    flags.update(config.get("member_cache", {}))
+
+    if not intents.members:
+        flags["joined"] = False
+    if not intents.voice_states:
+        flags["voice"] = False
+
+    return discord.MemberCacheFlags(**flags)
+
+
+def client_options(config) -> dict:
+    """
+    Keyword arguments for commands.Bot built from the gateway config.
+    """
+
+    intents = build_intents(config)
+
+    return {
+        "intents": intents,
+        "member_cache_flags": build_member_cache_flags(config, intents),
+        "chunk_guilds_at_startup": config.get(
+            "chunk_guilds_at_startup", DEFAULT_CHUNK_GUILDS_AT_STARTUP
+        )
+        and intents.members,
+        "max_messages": config.get("max_messages", DEFAULT_MAX_MESSAGES),
+        # Needed for on_socket_raw_receive, only when recording
+        "enable_debug_events": bool(config.get("record")),
+    }
+
+
+def check_listener_intents(bot) -> list[str]:
+    """
+    Warn about listeners that won't fire because their intent is disabled.
+
+    Returns the warnings.
+    """
+
+    intents = bot.intents
+    warnings = []
+
+    listeners = [
+        (name, getattr(func, "__qualname__", repr(func)))
+        for name, funcs in bot.extra_events.items()
+        for func in funcs
+    ]
+    listeners += [
+        (name, f"{type(bot).__name__}.{name}")
+        for name in LISTENER_INTENTS
+        if name in type(bot).__dict__
+    ]
+
+    for name, owner in listeners:
+        needed = LISTENER_INTENTS.get(name)
+        if needed and not any(getattr(intents, flag) for flag in needed):
+            warnings.append(
+                f"{owner} listens for {name} but the {' or '.join(needed)} intent is disabled."
+            )
+
+    if bot.all_commands and not intents.message_content:
+        warnings.append(
+            "Prefix commands are loaded but the message_content intent is disabled."
+        )
+
+    for warning in warnings:
+        RICKLOG_DISCORD.warning(warning)
+
+    return warnings
+
+
+# Classes
+
+
+class GatewayRecorder:
+    """
+    Records raw gateway events to a JSON Lines file, written in a thread in batches.
+    """
+
+    def __init__(self, bot, path: str, limit: int = DEFAULT_RECORD_LIMIT):
+        self.bot = bot
+        self.path = path
+        self.limit = limit
+
+        self.recorded = 0
+        self.buffer: list[str] = []
+
+    def start(self) -> None:
+        self.bot.add_listener(self.on_socket_raw_receive)
+        RICKLOG_DISCORD.warning(
+            f"Recording up to {self.limit} gateway events to {self.path}."
+        )
+
+    async def on_socket_raw_receive(self, msg: str):
+        if self.recorded >= self.limit:
+            return
+
+        self.buffer.append(msg)
+        self.recorded += 1
+
+        if len(self.buffer) >= 1000 or self.recorded >= self.limit:
+            await self.flush()
+
+        if self.recorded >= self.limit:
+            self.bot.remove_listener(self.on_socket_raw_receive)
+            RICKLOG_DISCORD.info(f"Gateway recording finished ({self.path}).")
+
+    async def flush(self) -> None:
+        buffer, self.buffer = self.buffer, []
+        if buffer:
+            await asyncio.to_thread(self._write, buffer)
+
+    def _write(self, buffer: list[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for msg in buffer:
+                f.write(msg.replace("\n", " ") + "\n")
+
+
+# Replay
+
+
+def filter_event(event: dict, intents: discord.Intents) -> dict | None:
+    """
+    Drop or trim a recorded event the way Discord would for the given intents.
+    """
+
+    name = event.get("t")
+    data = event.get("d")
+
+    needed = EVENT_INTENTS.get(name)
+    if needed and not any(getattr(intents, flag) for flag in needed):
+        return None
+
+    if name == "GUILD_CREATE" and isinstance(data, dict):
+        data = dict(data)
+        if not intents.presences:
+            data["presences"] = []
+        if not intents.voice_states:
+            data["voice_states"] = []
+        if not intents.members:
+            data["members"] = [
+                m for m in data.get("members", []) if m["user"].get("bot")
+            ][:1]
+        event = {**event, "d": data}
+
+    if name == "MESSAGE_CREATE" and not intents.message_content:
+        event = {
+            **event,
+            "d": {**data, "content": "", "embeds": [], "attachments": []},
+        }
+
+    return event
+
+
+async def replay(events: list, options: dict) -> dict:
+    """
+    Feed recorded events through a fresh client's connection state.
+
+    Returns the CPU time, traced memory and cache sizes.
+    """
+
+    import time
+    import tracemalloc
+
+    options = {
+        key: value for key, value in options.items() if key != "enable_debug_events"
+    }
+    options["chunk_guilds_at_startup"] = False
+
+    client = discord.Client(**options)
+    state = client._connection
+    intents = options["intents"]
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+
+    applied = 0
+    for event in events:
+        if event.get("op") != 0:
+            continue
+
+        event = filter_event(event, intents)
+        if event is None:
+            continue
+
+        parser = state.parsers.get(event["t"])
+        if parser is None:
+            continue
+
+        parser(event["d"])
+        applied += 1
+
+        # Let dispatched listener tasks run, as the gateway would
+        if applied % 1000 == 0:
+            await asyncio.sleep(0)
+
+    await asyncio.sleep(0)
+
+    cpu = time.process_time() - cpu_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "events": applied,
+        "cpu_ms": cpu * 1000,
+        "memory_mb": current / 1024 / 1024,
+        "peak_mb": peak / 1024 / 1024,
+        "members": sum(len(guild.members) for guild in client.guilds),
+        "messages": len(state._messages or []),
+    }
+
+    if state._ready_task is not None:
+        state._ready_task.cancel()
+    await client.close()
+
+    return result
+
+
+def load_recording(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_events(
+    members: int = 5000,
+    presences: int = 20000,
+    typing: int = 5000,
+    messages: int = 5000,
+) -> list:
+    """
+    A made-up recording with the shape of a busy guild, used when there's no real recording.
+    """
+
+    import random
+
+    guild_id = "100"
+    channel_id = "200"
+    timestamp = "2024-01-01T00:00:00+00:00"
+
+    def user(i):
+        return {
+            "id": str(1000 + i),
+            "username": f"user{i}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+        }
+
+    def member(i):
+        return {
+            "user": user(i),
+            "roles": [],
+            "joined_at": timestamp,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+
+    def presence(i):
+        return {
+            "user": {"id": str(1000 + i)},
+            "guild_id": guild_id,
+            "status": random.choice(["online", "idle", "dnd"]),
+            "activities": [{"name": f"game {i % 50}", "type": 0}],
+            "client_status": {"desktop": "online"},
+        }
+
+    events = [
+        {
+            "op": 0,
+            "t": "READY",
+            "d": {
+                "v": 10,
+                "user": {**user(-999), "bot": True},
+                "guilds": [{"id": guild_id, "unavailable": True}],
+                "session_id": "replay",
+                "resume_gateway_url": "wss://gateway.discord.gg",
+                "application": {"id": "1", "flags": 0},
+            },
+        },
+        {
+            "op": 0,
+            "t": "GUILD_CREATE",
+            "d": {
+                "id": guild_id,
+                "name": "Replay",
+                "owner_id": "1000",
+                "member_count": members,
+                "large": True,
+                "roles": [
+                    {
+                        "id": guild_id,
+                        "name": "@everyone",
+                        "permissions": "0",
+                        "position": 0,
+                        "color": 0,
+                        "hoist": False,
+                        "managed": False,
+                        "mentionable": False,
+                    }
+                ],
+                "channels": [
+                    {
+                        "id": channel_id,
+                        "type": 0,
+                        "name": "general",
+                        "position": 0,
+                        "permission_overwrites": [],
+                    }
+                ],
+                "members": [member(i) for i in range(members)],
+                "presences": [presence(i) for i in range(members // 2)],
+                "voice_states": [],
+                "emojis": [],
+                "stickers": [],
+                "threads": [],
+                "stage_instances": [],
+                "guild_scheduled_events": [],
+            },
+        },
+    ]
+
+    traffic = (
+        ["PRESENCE_UPDATE"] * presences
+        + ["TYPING_START"] * typing
+        + ["MESSAGE_CREATE"] * messages
+    )
+    random.shuffle(traffic)
+
+    for n, name in enumerate(traffic):
+        i = random.randrange(members)
+
+        if name == "PRESENCE_UPDATE":
+            data = presence(i)
+        elif name == "TYPING_START":
+            data = {
+                "channel_id": channel_id,
+                "guild_id": guild_id,
+                "user_id": str(1000 + i),
+                "timestamp": 0,
+                "member": member(i),
+            }
+        else:
+            data = {
+                "id": str(10_000_000 + n),
+                "channel_id": channel_id,
+                "guild_id": guild_id,
+                "author": user(i),
+                "member": {k: v for k, v in member(i).items() if k != "user"},
+                "content": "hello " * random.randint(1, 30),
+                "timestamp": timestamp,
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            }
+
+        events.append({"op": 0, "t": name, "d": data})
+
+    return events
+
+
+# Compare the configured gateway settings against Intents.all() on a recording
+# Usage: python -m helpers.gateway [recording.jsonl]
+if __name__ == "__main__":
+    import sys
+
+    from helpers.config import get_config
+
+    if len(sys.argv) > 1:
+        events = load_recording(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        events = synthetic_events()
+        source = "synthetic events"
+
+    configs = {
+        "Intents.all()": {
+            "intents": discord.Intents.all(),
+            "member_cache_flags": discord.MemberCacheFlags.all(),
+            "max_messages": DEFAULT_MAX_MESSAGES,
+        },
+        "configured": client_options(get_config().config.get("gateway", {})),
+    }
+
+    print(f"Replaying {len(events)} events from {source}\n")
+    print(
+        f"{'Settings':<16} {'Events':>8} {'CPU':>10} {'Memory':>10} {'Peak':>10} {'Members':>8} {'Messages':>9}"
+    )
+
+    for name, options in configs.items():
+        result = asyncio.run(replay(events, options))
+        print(
+            f"{name:<16} {result['events']:>8} {result['cpu_ms']:>8.0f}ms {result['memory_mb']:>8.1f}MB "
+            f"{result['peak_mb']:>8.1f}MB {result['members']:>8} {result['messages']:>9}"
+        )
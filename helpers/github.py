@@ -0,0 +1,180 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for fetching the bot's commits from the GitHub API.
+
+The parsed and sorted commit list is cached and revalidated with If-None-Match, an unchanged repo
+costs a 304 and nothing more (304s don't count against GitHub's rate limit either).
+If GitHub can't be reached the last good list is served instead, marked as stale.
+"""
+
+# Import the required modules
+
+# Python standard library
+from datetime import datetime
+import asyncio
+import time
+
+# Third-party libraries
+import aiohttp
+
+# Helpers
+from helpers.logs import RICKLOG_HELPERS
+
+# Constants
+
+GITHUB_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# How long a fetched list is used without asking GitHub at all (seconds)
+GITHUB_CACHE_FRESH = 60
+
+# Keys every commit from the API must have
+GITHUB_COMMIT_KEYS = ("sha", "commit", "author", "url", "html_url")
+
+# Custom Exceptions
+
+
+class GitHubAPIError(Exception):
+    """
+    Raised when there is an error with the GitHub API or the supplied link.
+    """
+
+    pass
+
+
+# Functions
+
+
+def commits_api_url(repo_link: str) -> str:
+    """
+    Turn a https://github.com/<user>/<repo> link into its commits API URL.
+    """
+
+    if not repo_link.startswith("https://github.com/"):
+        raise GitHubAPIError("The provided link is not a valid GitHub repo link.")
+
+    try:
+        username, repo_name = repo_link.split("github.com/")[-1].split("/")
+    except ValueError:
+        raise GitHubAPIError("The provided link is not a valid GitHub repo link.")
+
+    return f"https://api.github.com/repos/{username}/{repo_name}/commits"
+
+
+def parse_commits(data) -> list[dict]:
+    """
+    Parse the API response into commit dicts, newest first.
+    """
+
+    if not isinstance(data, list):
+        raise GitHubAPIError("Unexpected response from the GitHub API.")
+
+    commit_list = []
+    for commit in data:
+        if not all(key in commit for key in GITHUB_COMMIT_KEYS):
+            raise GitHubAPIError("A commit from the GitHub API is missing information.")
+
+        author = commit["commit"]["author"]
+
+        commit_list.append(
+            {
+                "sha": commit["sha"],
+                "id": commit["sha"][0:7],
+                "date": datetime.strptime(author["date"], GITHUB_DATE_FORMAT),
+                "author": author["name"],
+                "author_html_url": (commit["author"] or {}).get("html_url"),
+                "email": author["email"],
+                "short_message": commit["commit"]["message"].split("\n")[0],
+                "full_message": commit["commit"]["message"],
+                "url": commit["url"],
+                "html_url": commit["html_url"],
+            }
+        )
+
+    commit_list.sort(key=lambda commit: commit["date"], reverse=True)
+
+    return commit_list
+
+
+# Classes
+
+
+class GitHubCommits:
+    """
+    Cached, conditionally revalidated list of a repo's commits.
+
+    Attributes:
+        commits: The last good commit list, newest first (None until the first fetch).
+        stale: Whether the last revalidation failed and commits is old data.
+    """
+
+    def __init__(self, bot, api_url: str):
+        self.bot = bot
+        self.api_url = api_url
+
+        self.commits: list[dict] = None  # type: ignore
+        self.etag: str = None  # type: ignore
+        self.checked_at = 0.0
+        self.stale = False
+
+        # Concurrent callers share one request
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> list[dict]:
+        """
+        The commit list, revalidated if it is older than GITHUB_CACHE_FRESH.
+
+        Raises GitHubAPIError only when GitHub fails and there is nothing cached.
+        """
+
+        async with self._lock:
+            if (
+                self.commits is not None
+                and time.monotonic() - self.checked_at < GITHUB_CACHE_FRESH
+            ):
+                return self.commits
+
+            try:
+                await self._fetch()
+            except GitHubAPIError as e:
+                if self.commits is None:
+                    raise
+
+                RICKLOG_HELPERS.warning(
+                    f"GitHub commits unavailable, serving cached data: {e}"
+                )
+                self.stale = True
+
+                # Don't hammer GitHub while it's down
+                self.checked_at = time.monotonic()
+
+            return self.commits
+
+    async def _fetch(self) -> None:
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.etag is not None and self.commits is not None:
+            headers["If-None-Match"] = self.etag
+
+        try:
+            async with self.bot.session.get(self.api_url, headers=headers) as response:
+                if response.status == 304:
+                    self.checked_at = time.monotonic()
+                    self.stale = False
+                    return
+
+                if response.status != 200:
+                    raise GitHubAPIError(
+                        f"GitHub API returned status {response.status}."
+                    )
+
+                data = await response.json(content_type=None)
+                etag = response.headers.get("ETag")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise GitHubAPIError(f"Failed to reach the GitHub API: {e}") from e
+
+        self.commits = parse_commits(data)
+        self.etag = etag
+        self.checked_at = time.monotonic()
+        self.stale = False
@@ -0,0 +1,55 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for outbound (non-Discord) HTTP.
+
+RickBot owns a single long-lived aiohttp session created by create_http_session(),
+every webhook, paste upload and API call should go through it so that connections are reused.
+"""
+
+# Import the required modules
+
+# Third-party libraries
+import aiohttp
+
+# Constants
+
+# Total number of pooled connections, and the number allowed to a single host
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 10
+
+# How long an idle keep-alive connection is held open (seconds)
+HTTP_KEEPALIVE_TIMEOUT = 60
+
+# How long resolved DNS entries are cached (seconds)
+HTTP_DNS_CACHE_TTL = 300
+
+# Default timeout for a whole request (seconds)
+HTTP_REQUEST_TIMEOUT = 30
+
+# Functions
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create the shared, connection-pooled aiohttp session.
+
+    Must be called from within a running event loop (e.g. setup_hook).
+    DNS lookups go through aiodns via the AsyncResolver and are cached.
+    """
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        resolver=aiohttp.AsyncResolver(),
+        enable_cleanup_closed=True,
+    )
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+    )
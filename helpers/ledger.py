@@ -0,0 +1,188 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for the append-only money transaction ledger.
+
+Every money mutation appends a compact record to the ledger collection:
+    uid, counterparty, type, amount, before, after, ts
+
+Records are buffered in memory and written with insert_many,
+either every few seconds or as soon as a full batch is waiting.
+"""
+
+# Import the required modules
+
+# Python standard library
+from datetime import datetime, timezone
+import asyncio
+
+# Third-party libraries
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# Helpers
+from helpers.logs import RICKLOG_BG
+
+# Database
+from helpers import db
+
+# Constants
+
+# Records written per insert_many
+LEDGER_BATCH_SIZE = 100
+
+# How often buffered records are written (seconds)
+LEDGER_FLUSH_INTERVAL = 5.0
+
+# Records kept in memory while the database is unreachable, older ones are dropped
+LEDGER_MAX_BUFFER = 10000
+
+# Functions
+
+
+def balances(user: dict) -> dict:
+    """
+    The wallet and bank of a money document, as stored in a ledger record.
+    """
+
+    return {"wallet": user.get("wallet", 0), "bank": user.get("bank", 0)}
+
+
+# Classes
+
+
+class Ledger:
+    """
+    Buffers ledger records and bulk inserts them in the background.
+    """
+
+    def __init__(self):
+        self.buffer: list[dict] = []
+
+        self.written = 0
+        self.dropped = 0
+
+        self._task = None
+        self._flush_lock = asyncio.Lock()
+
+        # Flush started early because a full batch is waiting, kept so it isn't garbage collected
+        self._flush_task: asyncio.Task = None  # type: ignore
+
+    def ensure_indexes(self) -> None:
+        """
+        Create the (uid, ts) index used by statements, blocking.
+        """
+
+        db.ledger_collection.create_index([("uid", ASCENDING), ("ts", DESCENDING)])
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._flusher())
+
+    def record(
+        self,
+        uid: int,
+        type: str,
+        amount: int,
+        before: dict,
+        after: dict,
+        counterparty: int | None = None,
+    ) -> None:
+        """
+        Append a record to the ledger, never blocks.
+
+        :param uid: The user whose balance changed.
+        :param type: The kind of transaction, e.g. "deposit".
+        :param amount: The amount of the transaction.
+        :param before: The user's balances before, see balances().
+        :param after: The user's balances after, see balances().
+        :param counterparty: The other user involved, if any.
+        """
+
+        self.buffer.append(
+            {
+                "uid": uid,
+                "counterparty": counterparty,
+                "type": type,
+                "amount": amount,
+                "before": before,
+                "after": after,
+                "ts": datetime.now(timezone.utc),
+            }
+        )
+
+        if len(self.buffer) >= LEDGER_BATCH_SIZE and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+            self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            RICKLOG_BG.error(f"Failed to flush the ledger: {task.exception()}")
+
+    async def flush(self) -> None:
+        """
+        Write every buffered record.
+        """
+
+        async with self._flush_lock:
+            while self.buffer:
+                batch = self.buffer[:LEDGER_BATCH_SIZE]
+                del self.buffer[:LEDGER_BATCH_SIZE]
+
+                try:
+                    await asyncio.to_thread(
+                        db.ledger_collection.insert_many, batch, ordered=False
+                    )
+                except BulkWriteError as e:
+                    # Duplicate keys are records that made it in on an earlier attempt
+                    failed = [
+                        batch[error["index"]]
+                        for error in e.details.get("writeErrors", [])
+                        if error.get("code") != 11000
+                    ]
+                    self.written += len(batch) - len(failed)
+
+                    if failed:
+                        self._requeue(failed, e)
+                        return
+                    continue
+                except PyMongoError as e:
+                    self._requeue(batch, e)
+                    return
+
+                self.written += len(batch)
+
+    def _requeue(self, records: list, error: Exception) -> None:
+        RICKLOG_BG.error(
+            f"Failed to write {len(records)} ledger record(s), will retry: {error}"
+        )
+
+        # Put the records back in front and trim the oldest if we're over the limit
+        self.buffer[:0] = records
+        overflow = len(self.buffer) - LEDGER_MAX_BUFFER
+        if overflow > 0:
+            del self.buffer[:overflow]
+            self.dropped += overflow
+            RICKLOG_BG.critical(f"Ledger buffer is full, dropped {overflow} record(s).")
+
+    async def close(self) -> None:
+        """
+        Stop the background flusher and write anything left in the buffer.
+        """
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+
+        await self.flush()
+
+    async def _flusher(self) -> None:
+        while True:
+            await asyncio.sleep(LEDGER_FLUSH_INTERVAL)
+            await self.flush()
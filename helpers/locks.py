@@ -0,0 +1,195 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for per-user locks around money operations.
+
+Money commands read a balance, decide, then write. Two commands from the same user that overlap
+(e.g. one waiting on a confirmation) would both act on the old balance. Locking by uid serializes them
+without any locking in the database. Locks only exist while someone holds or waits for them,
+they are kept in a WeakValueDictionary.
+"""
+
+# Import the required modules
+
+# Python standard library
+import asyncio
+import functools
+import weakref
+
+# Classes
+
+
+class KeyedLocks:
+    """
+    One asyncio.Lock per key, created on demand and dropped once unused.
+    """
+
+    def __init__(self):
+        self._locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._locks)
+
+    def get(self, key) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def locked(self, key) -> bool:
+        lock = self._locks.get(key)
+        return lock is not None and lock.locked()
+
+    def lock(self, key) -> "HeldLocks":
+        """
+        async with locks.lock(uid): ...
+        """
+
+        return HeldLocks([self.get(key)])
+
+    def lock_many(self, *keys) -> "HeldLocks":
+        """
+        Hold the locks for several keys at once.
+
+        Locks are always taken in sorted key order so two operations on the same
+        pair of users (A -> B and B -> A) can't deadlock.
+        """
+
+        return HeldLocks([self.get(key) for key in sorted(set(keys))])
+
+
+class HeldLocks:
+    """
+    Async context manager acquiring a list of locks in order, it also keeps them alive while held.
+    """
+
+    __slots__ = ("locks", "acquired")
+
+    def __init__(self, locks: list):
+        self.locks = locks
+        self.acquired = 0
+
+    async def __aenter__(self):
+        try:
+            for lock in self.locks:
+                await lock.acquire()
+                self.acquired += 1
+        except BaseException:
+            self._release()
+            raise
+
+    async def __aexit__(self, *exc_info):
+        self._release()
+
+    def _release(self):
+        for lock in reversed(self.locks[: self.acquired]):
+            lock.release()
+        self.acquired = 0
+
+
+# Functions
+
+
+def money_lock(*key_getters):
+    """
+    Decorator for money commands, serializes the command per user.
+
+    With no arguments it locks the invoking user, otherwise each getter is called with
+    the command's arguments (ctx, *args) and returns a uid to lock as well, for example
+        @money_lock(lambda ctx, member, amount: member.id)
+    Put it below @commands.command.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, ctx, *args, **kwargs):
+            keys = [ctx.author.id]
+            keys.extend(getter(ctx, *args, **kwargs) for getter in key_getters)
+
+            async with MONEY_LOCKS.lock_many(*keys):
+                return await func(self, ctx, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# The locks used by every money command, keyed by uid
+MONEY_LOCKS = KeyedLocks()
+
+
+if __name__ == "__main__":
+    # Compare against bare asyncio.Lock, uncontended and with many tasks fighting over a few users
+    import time
+
+    ITERATIONS = 100_000
+
+    async def bench_uncontended():
+        bare = asyncio.Lock()
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            async with bare:
+                pass
+        bare_time = time.perf_counter() - start
+
+        locks = KeyedLocks()
+        start = time.perf_counter()
+        for i in range(ITERATIONS):
+            async with locks.lock(i % 100):
+                pass
+        keyed_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(ITERATIONS):
+            async with locks.lock_many(i % 100, (i + 1) % 100):
+                pass
+        pair_time = time.perf_counter() - start
+
+        print(f"Uncontended, per operation ({ITERATIONS:,} operations):")
+        print(f"  asyncio.Lock        {bare_time / ITERATIONS * 1e6:6.2f}us")
+        print(f"  KeyedLocks.lock     {keyed_time / ITERATIONS * 1e6:6.2f}us")
+        print(f"  KeyedLocks.lock_many {pair_time / ITERATIONS * 1e6:5.2f}us (2 keys)")
+
+    async def bench_contended(tasks: int = 1000, users: int = 10, rounds: int = 20):
+        locks = KeyedLocks()
+        balances = dict.fromkeys(range(users), 0)
+
+        async def worker(n: int):
+            for r in range(rounds):
+                uid = (n + r) % users
+                async with locks.lock(uid):
+                    # Read-modify-write with a yield in between, lost updates without the lock
+                    balance = balances[uid]
+                    await asyncio.sleep(0)
+                    balances[uid] = balance + 1
+
+        async def transfer(n: int):
+            for r in range(rounds):
+                a, b = (n + r) % users, (n + r + 1) % users
+                if n % 2:
+                    a, b = b, a
+                async with locks.lock_many(a, b):
+                    await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(tasks)))
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(transfer(n) for n in range(tasks)))
+        pair_time = time.perf_counter() - start
+
+        total = tasks * rounds
+        print(f"Contended, {tasks} tasks over {users} users ({total:,} operations):")
+        print(
+            f"  single key  {single_time / total * 1e6:6.2f}us per operation, "
+            f"lost updates: {total - sum(balances.values())}"
+        )
+        print(
+            f"  key pairs   {pair_time / total * 1e6:6.2f}us per operation, no deadlocks"
+        )
+        print(f"  locks left  {len(locks)}")
+
+    asyncio.run(bench_uncontended())
+    asyncio.run(bench_contended())
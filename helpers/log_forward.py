@@ -0,0 +1,209 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for forwarding important log records to a Discord channel.
+
+The handler runs on the logging listener thread and only counts records, the bot's event loop
+sends one summary every few seconds through RickBot.send_to_channel. Identical records within a window
+are collapsed into a single "×N" line.
+"""
+
+# Import the required modules
+
+# Python standard library
+import asyncio
+import logging
+import threading
+
+# Third-party libraries
+import discord
+
+# Helpers
+from helpers.colors import ERROR_EMBED_COLOR, MAIN_EMBED_COLOR
+from helpers.logs import RICKLOG_WEBHOOK
+
+# Constants
+
+# How long records are collected before a summary is sent (seconds)
+LOG_FORWARD_WINDOW = 10.0
+
+# Maximum number of distinct records in one summary, anything over this is only counted
+LOG_FORWARD_MAX_LINES = 50
+
+# Longest message forwarded for a single record
+LOG_FORWARD_MESSAGE_LENGTH = 300
+
+# Discord limits
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBEDS_PER_MESSAGE = 10
+
+# Classes
+
+
+class DiscordLogHandler(logging.Handler):
+    """
+    Forwards WARNING and above to a channel, aggregated over LOG_FORWARD_WINDOW.
+
+    Records are never forwarded if they:
+        - have no_forward set (e.g. extra={"no_forward": True}), or
+        - are about the log channel itself (extra={"channel_id": ...}),
+    so a failing send can't feed itself.
+    """
+
+    def __init__(self, bot, channel_id: int, level=logging.WARNING):
+        super().__init__(level)
+
+        self.bot = bot
+        self.channel_id = channel_id
+
+        # (levelno, logger, message) -> count, for the current window
+        self.pending: dict[tuple, int] = {}
+        self.overflowed = 0
+
+        self._pending_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop = None  # type: ignore
+        self._task: asyncio.Task = None  # type: ignore
+        self._scheduled = False
+
+    def start(self) -> None:
+        """
+        Bind the handler to the running event loop.
+        """
+
+        self._loop = asyncio.get_running_loop()
+
+    def emit(self, record):
+        if getattr(record, "no_forward", False):
+            return
+
+        if getattr(record, "channel_id", None) == self.channel_id:
+            return
+
+        if self._loop is None or self._loop.is_closed():
+            return
+
+        message = record.getMessage().split("\n", 1)[0][:LOG_FORWARD_MESSAGE_LENGTH]
+        key = (record.levelno, record.name, message)
+
+        with self._pending_lock:
+            if key in self.pending:
+                self.pending[key] += 1
+            elif len(self.pending) < LOG_FORWARD_MAX_LINES:
+                self.pending[key] = 1
+            else:
+                self.overflowed += 1
+
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        try:
+            self._loop.call_soon_threadsafe(self._schedule_flush)
+        except RuntimeError:
+            # The loop closed between the check and the call
+            pass
+
+    def _schedule_flush(self) -> None:
+        self._task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(LOG_FORWARD_WINDOW)
+
+        # Records logged before the bot is ready are held until it is
+        await self.bot.wait_until_ready()
+
+        await self.flush_now()
+
+    async def flush_now(self) -> None:
+        """
+        Send everything collected so far.
+        """
+
+        with self._pending_lock:
+            pending, self.pending = self.pending, {}
+            overflowed, self.overflowed = self.overflowed, 0
+            self._scheduled = False
+
+        if not pending:
+            return
+
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            RICKLOG_WEBHOOK.error(
+                f"Log forwarding channel {self.channel_id} not found, dropping {sum(pending.values())} record(s).",
+                extra={"no_forward": True},
+            )
+            return
+
+        embeds = self.build_embeds(pending, overflowed)
+
+        for i in range(0, len(embeds), EMBEDS_PER_MESSAGE):
+            try:
+                future = self.bot.send_to_channel(
+                    channel, embeds=embeds[i : i + EMBEDS_PER_MESSAGE]
+                )
+            except Exception as e:
+                RICKLOG_WEBHOOK.error(
+                    f"Failed to forward log records: {e}", extra={"no_forward": True}
+                )
+                return
+
+            future.add_done_callback(self._send_done)
+
+    def build_embeds(self, pending: dict, overflowed: int) -> list[discord.Embed]:
+        lines = []
+        for (levelno, name, message), count in sorted(
+            pending.items(), key=lambda item: item[0][0], reverse=True
+        ):
+            line = f"`{logging.getLevelName(levelno)}` **{name}** {message}"
+            if count > 1:
+                line += f" **×{count}**"
+            lines.append(line)
+
+        if overflowed:
+            lines.append(f"…and {overflowed} more record(s).")
+
+        color = (
+            ERROR_EMBED_COLOR
+            if max(key[0] for key in pending) >= logging.ERROR
+            else MAIN_EMBED_COLOR
+        )
+
+        embeds = []
+        description = ""
+        for line in lines:
+            line = line[: EMBED_DESCRIPTION_LIMIT - 1]
+            if len(description) + len(line) + 1 > EMBED_DESCRIPTION_LIMIT:
+                embeds.append(description)
+                description = ""
+            description += line + "\n"
+        embeds.append(description)
+
+        return [
+            discord.Embed(
+                title="Log Summary", description=description, color=color
+            ).set_footer(text=f"RickBot | Last {LOG_FORWARD_WINDOW:.0f}s")
+            for description in embeds
+        ]
+
+    def _send_done(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is not None:
+            RICKLOG_WEBHOOK.error(
+                f"Failed to forward log records: {error}", extra={"no_forward": True}
+            )
+
+    async def drain(self) -> None:
+        """
+        Send whatever is still pending, used when shutting down.
+        """
+
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+        if self.bot.is_ready():
+            await self.flush_now()
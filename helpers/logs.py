@@ -8,16 +8,41 @@ This is a helper for logging.
 # Import the required modules
 
 # Python standard library
+from datetime import datetime, timezone
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener
+import atexit
+import copy
+import glob
+import gzip
 import logging
+import os
+import queue
 import re
+import shutil
+import time
+
+# Third-party libraries
+import orjson
+
+# Constants
+
+# ANSI escape sequences regex pattern
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1B[@-_][0-?]*[ -/]*[@-~]")
+
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Log files are rotated when they reach this size (bytes) or age (hours), whichever comes first
+LOG_ROTATE_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_HOURS = 24
+
+# Number of compressed archives kept for each log file
+LOG_ROTATE_BACKUP_COUNT = 14
 
 # Helper functions
 
 
 def remove_ansi_escape_sequences(s: str) -> str:
-    # ANSI escape sequences regex pattern
-    ansi_escape_pattern = re.compile(r"\x1B[@-_][0-?]*[ -/]*[@-~]")
-    return ansi_escape_pattern.sub("", s)
+    return ANSI_ESCAPE_PATTERN.sub("", s)
 
 
 # Custom formatter class with colors
@@ -34,10 +59,30 @@ class CustomFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
 
+    def __init__(self):
+        super().__init__(datefmt=LOG_DATE_FORMAT)
+
+        # One formatter per level, built once instead of for every record
+        self.formatters = {
+            level: self._build_formatter(self.COLORS[logging.getLevelName(level)])
+            for level in (
+                logging.DEBUG,
+                logging.INFO,
+                logging.WARNING,
+                logging.ERROR,
+                logging.CRITICAL,
+            )
+        }
+        self.default_formatter = self._build_formatter("")
+
+    def _build_formatter(self, level_color: str) -> logging.Formatter:
+        log_fmt = f'{self.COLORS.get("DATE")}%(asctime)s{self.RESET} {level_color}%(levelname)s{self.RESET}     {self.COLORS.get("NAME")}%(name)s{self.RESET} %(message)s'
+        return logging.Formatter(log_fmt, LOG_DATE_FORMAT)
+
     def format(self, record):
-        log_fmt = f'{self.COLORS.get("DATE")}%(asctime)s{self.RESET} {self.COLORS.get(record.levelname, "")}%(levelname)s{self.RESET}     {self.COLORS.get("NAME")}%(name)s{self.RESET} %(message)s'
-        formatter = logging.Formatter(log_fmt, "%Y-%m-%d %H:%M:%S")
-        return formatter.format(record)
+        return self.formatters.get(record.levelno, self.default_formatter).format(
+            record
+        )
 
 
 # Custom formatter that removes ANSI colors
@@ -47,17 +92,194 @@ class CustomFileFormatter(logging.Formatter):
         return remove_ansi_escape_sequences(original_format)
 
 
+# Formatter that writes one JSON object per line
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": remove_ansi_escape_sequences(record.getMessage()),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+
+        # Records that came through the queue carry the traceback in exc_text (see TracebackQueueHandler)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return orjson.dumps(entry, default=str).decode()
+
+
+# QueueHandler that keeps the traceback out of the message
+class TracebackQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare() folds the traceback into the message and drops exc_info,
+    so the JSON sink couldn't give it its own field. This keeps it in exc_text instead,
+    the listener's formatters still append it to the message.
+    """
+
+    formatter_for_exceptions = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+
+        # Formatted here, the traceback objects don't outlive the call
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatter_for_exceptions.formatException(
+                record.exc_info
+            )
+
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+# Filter that keeps 1 in N records for chosen loggers and levels
+class SamplingFilter(logging.Filter):
+    """
+    Rates are keyed by logger name and level, a logger name also covers its children.
+
+    For example {"rickbot.bg": {"DEBUG": 100}} keeps 1 in 100 rickbot.bg debug records.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+
+        self.rates = {
+            (name, logging.getLevelName(level.upper())): int(rate)
+            for name, levels in rates.items()
+            for level, rate in levels.items()
+            if int(rate) > 1
+        }
+        self.counters: dict[tuple, int] = {}
+
+        # Results are cached per logger name, most records come from a handful of loggers
+        self._rules: dict[tuple, tuple | None] = {}
+
+    def _rule(self, name: str, level: int):
+        key = (name, level)
+        if key not in self._rules:
+            rule = None
+            while name:
+                if (name, level) in self.rates:
+                    rule = (name, level)
+                    break
+                name = name.rpartition(".")[0]
+            self._rules[key] = rule
+        return self._rules[key]
+
+    def filter(self, record):
+        rule = self._rule(record.name, record.levelno)
+        if rule is None:
+            return True
+
+        count = self.counters.get(rule, 0)
+        self.counters[rule] = count + 1
+
+        return count % self.rates[rule] == 0
+
+
+# File handler that rotates on size and age, and gzips the old files
+class RotatingLogFileHandler(BaseRotatingHandler):
+    def __init__(
+        self,
+        filename: str,
+        *,
+        max_bytes: int = LOG_ROTATE_MAX_BYTES,
+        rotate_hours: float = LOG_ROTATE_HOURS,
+        backup_count: int = LOG_ROTATE_BACKUP_COUNT,
+    ):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        super().__init__(filename, "a", encoding="utf-8", delay=False)
+
+        self.max_bytes = max_bytes
+        self.interval = rotate_hours * 3600
+        self.backup_count = backup_count
+
+        # An existing file keeps the age it had before the restart
+        try:
+            opened_at = os.path.getmtime(self.baseFilename)
+        except OSError:
+            opened_at = time.time()
+
+        if self.stream is not None and self.stream.tell() == 0:
+            opened_at = time.time()
+
+        self.rollover_at = opened_at + self.interval
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+
+        if self.stream is None:
+            self.stream = self._open()
+
+        if self.max_bytes > 0:
+            # Approximates the size of the formatted record, close enough for rotation
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return True
+
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            archive = f"{self.baseFilename}.{datetime.now():%Y%m%d-%H%M%S}"
+
+            n = 1
+            while os.path.exists(archive + ".gz"):
+                archive = f"{self.baseFilename}.{datetime.now():%Y%m%d-%H%M%S}.{n}"
+                n += 1
+
+            with open(self.baseFilename, "rb") as source, gzip.open(
+                archive + ".gz", "wb"
+            ) as target:
+                shutil.copyfileobj(source, target)
+
+            os.remove(self.baseFilename)
+
+            self._delete_old_archives()
+
+        self.stream = self._open()
+        self.rollover_at = time.time() + self.interval
+
+    def _delete_old_archives(self):
+        if self.backup_count <= 0:
+            return
+
+        archives = sorted(
+            glob.glob(glob.escape(self.baseFilename) + ".*.gz"), key=os.path.getmtime
+        )
+
+        for archive in archives[: -self.backup_count]:
+            try:
+                os.remove(archive)
+            except OSError:
+                pass
+
+
 # Define the RickBot logger
 RICKLOG = logging.getLogger("rickbot")
 RICKLOG.setLevel(logging.DEBUG)
 
 # Create a file and console handler
-file_handler = logging.FileHandler(filename="rickbot.log", mode="w")
+file_handler = RotatingLogFileHandler("rickbot.log")
 console_handler = logging.StreamHandler()
 
 # Create formatters
 file_formatter = CustomFileFormatter(
-    "%(asctime)s %(levelname)s     %(name)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+    "%(asctime)s %(levelname)s     %(name)s %(message)s", datefmt=LOG_DATE_FORMAT
 )
 console_formatter = CustomFormatter()
 
@@ -65,9 +287,87 @@ console_formatter = CustomFormatter()
 file_handler.setFormatter(file_formatter)
 console_handler.setFormatter(console_formatter)
 
-# Add the handlers to the logger
-RICKLOG.addHandler(file_handler)
-RICKLOG.addHandler(console_handler)
+# The logger only puts records on a queue, a listener thread does the formatting and writing
+# so that logging never blocks the event loop on disk or console I/O
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = TracebackQueueHandler(log_queue)
+queue_listener = QueueListener(
+    log_queue, file_handler, console_handler, respect_handler_level=True
+)
+
+# Add the queue handler to the logger
+RICKLOG.addHandler(queue_handler)
+
+queue_listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Stop the listener thread, writing out every record still queued.
+    """
+
+    # Safe to call more than once
+    if queue_listener._thread is not None:
+        queue_listener.stop()
+
+
+atexit.register(stop_logging)
+
+
+def add_log_handler(handler: logging.Handler) -> None:
+    """
+    Add a handler behind the queue listener, it will run on the listener thread.
+    """
+
+    # The listener reads its handlers for every record, replacing the tuple is enough
+    queue_listener.handlers = queue_listener.handlers + (handler,)
+
+
+def remove_log_handler(handler: logging.Handler) -> None:
+    queue_listener.handlers = tuple(
+        h for h in queue_listener.handlers if h is not handler
+    )
+
+
+def setup_json_logging(config: dict) -> logging.Handler | None:
+    """
+    Set up the optional structured JSON log sink.
+
+    Args:
+        config (dict): The "json" section of the logging config, for example
+            {
+                "enabled": true,
+                "path": "logs/rickbot.jsonl",
+                "max_bytes": 10485760,
+                "rotate_hours": 24,
+                "backup_count": 14,
+                "level": "DEBUG",
+                "sample": {"rickbot.bg": {"DEBUG": 100}}
+            }
+
+    Returns:
+        logging.Handler | None: The handler, or None if the sink is disabled.
+    """
+
+    if not config.get("enabled"):
+        return None
+
+    json_handler = RotatingLogFileHandler(
+        config.get("path", "logs/rickbot.jsonl"),
+        max_bytes=config.get("max_bytes", LOG_ROTATE_MAX_BYTES),
+        rotate_hours=config.get("rotate_hours", LOG_ROTATE_HOURS),
+        backup_count=config.get("backup_count", LOG_ROTATE_BACKUP_COUNT),
+    )
+    json_handler.setLevel(config.get("level", "DEBUG").upper())
+    json_handler.setFormatter(JSONFormatter())
+
+    if config.get("sample"):
+        json_handler.addFilter(SamplingFilter(config["sample"]))
+
+    add_log_handler(json_handler)
+
+    return json_handler
+
 
 # Define sub-loggers as constants
 RICKLOG_CMDS = logging.getLogger("rickbot.cmds")
@@ -78,7 +378,7 @@ RICKLOG_BG = logging.getLogger("rickbot.bg")
 RICKLOG_HELPERS = logging.getLogger("rickbot.helpers")
 
 # Add handlers to sub-loggers
-# Currently not required as the handlers are added to the main logger
+# Currently not required as the queue handler is added to the main logger
 """
 RICKLOG_CMDS.addHandler(file_handler)
 RICKLOG_CMDS.addHandler(console_handler)
@@ -121,8 +421,11 @@ def setup_discord_logging(level=logging.INFO) -> None:
     logging.getLogger("discord.http").setLevel(level)
 
 
-# Example usage
+# Example usage and benchmark
 if __name__ == "__main__":
+    import tempfile
+    import time
+
     RICKLOG.info("RickBot logging setup complete.")
     RICKLOG_CMDS.debug("This is a debug message from the cmds sub-logger.")
     RICKLOG_DISCORD.info("This is an info message from the discord sub-logger.")
@@ -130,3 +433,84 @@ if __name__ == "__main__":
     RICKLOG_WEBHOOK.error("This is an error message from the webhook sub-logger.")
     RICKLOG_BG.critical("This is a critical message from the background sub-logger.")
     RICKLOG_HELPERS.info("This is an info message from the helpers sub-logger.")
+
+    stop_logging()
+
+    # Time how long the caller spends logging 10k messages
+    BENCHMARK_MESSAGES = 10_000
+
+    def benchmark(name: str, logger: logging.Logger, fn) -> None:
+        start = time.perf_counter()
+        for i in range(BENCHMARK_MESSAGES):
+            fn(logger, i)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<45} {elapsed * 1000:8.2f}ms per {BENCHMARK_MESSAGES} messages")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The old setup: a formatter built per record, written synchronously
+        class PerRecordFormatter(CustomFormatter):
+            def format(self, record):
+                return self._build_formatter(
+                    self.COLORS.get(record.levelname, "")
+                ).format(record)
+
+        sync_logger = logging.getLogger("benchmark.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.DEBUG)
+        sync_file = logging.FileHandler(f"{tmp}/sync.log")
+        sync_file.setFormatter(PerRecordFormatter())
+        sync_logger.addHandler(sync_file)
+
+        # The new setup: a queue handler in front of the same kind of handler
+        bench_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queued_logger = logging.getLogger("benchmark.queued")
+        queued_logger.propagate = False
+        queued_logger.setLevel(logging.DEBUG)
+        queued_logger.addHandler(QueueHandler(bench_queue))
+        queued_file = logging.FileHandler(f"{tmp}/queued.log")
+        queued_file.setFormatter(CustomFormatter())
+        bench_listener = QueueListener(bench_queue, queued_file)
+        bench_listener.start()
+
+        benchmark(
+            "sync file handler, per-record formatter",
+            sync_logger,
+            lambda logger, i: logger.info(f"message {i} from benchmark"),
+        )
+        benchmark(
+            "queue handler, precompiled formatters",
+            queued_logger,
+            lambda logger, i: logger.info("message %s from benchmark", i),
+        )
+
+        # Formatting alone, per-record formatter against precompiled ones
+        record = sync_logger.makeRecord(
+            "benchmark", logging.INFO, __file__, 0, "message %s", (1,), None
+        )
+        benchmark(
+            "formatting only, per-record formatter",
+            sync_logger,
+            lambda logger, i: sync_file.formatter.format(record),  # type: ignore
+        )
+        benchmark(
+            "formatting only, precompiled formatters",
+            queued_logger,
+            lambda logger, i: queued_file.formatter.format(record),  # type: ignore
+        )
+
+        # Debug messages when the level is INFO, the hot path in production
+        sync_logger.setLevel(logging.INFO)
+        benchmark(
+            "disabled debug, f-string",
+            sync_logger,
+            lambda logger, i: logger.debug(f"message {i} from benchmark"),
+        )
+        benchmark(
+            "disabled debug, lazy %-args",
+            sync_logger,
+            lambda logger, i: logger.debug("message %s from benchmark", i),
+        )
+
+        bench_listener.stop()
+        sync_file.close()
+        queued_file.close()
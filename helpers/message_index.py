@@ -0,0 +1,180 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for a compact index of recent messages.
+
+discord.py's message cache keeps full Message objects, cleanup only needs who sent a message, where, when,
+how it starts and whether it was a bot. The index keeps just that in a ring buffer per channel,
+fed from RickBot.on_message, so cleaning recent messages doesn't need any history calls.
+
+Every message since the index started watching a channel is in it (until the ring buffer wraps),
+so the newest N messages can be answered from the index, and anything older falls back to channel.history().
+"""
+
+# Import the required modules
+
+# Python standard library
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+# Third-party libraries
+import discord
+
+# Constants
+
+# Messages kept per channel
+MESSAGE_INDEX_CHANNEL_SIZE = 1000
+
+# Channels kept, the least recently active channel is dropped first
+MESSAGE_INDEX_MAX_CHANNELS = 200
+
+# Characters of content kept, enough to check for command prefixes and code blocks
+MESSAGE_INDEX_PREFIX_LENGTH = 16
+
+# Classes
+
+
+class MessageRecord:
+    __slots__ = ("id", "channel_id", "author_id", "created_at", "prefix", "bot")
+
+    def __init__(
+        self,
+        id: int,
+        channel_id: int,
+        author_id: int,
+        created_at: datetime,
+        prefix: str,
+        bot: bool,
+    ):
+        self.id = id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.created_at = created_at
+        self.prefix = prefix
+        self.bot = bot
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> "MessageRecord":
+        return cls(
+            message.id,
+            message.channel.id,
+            message.author.id,
+            message.created_at,
+            message.content[:MESSAGE_INDEX_PREFIX_LENGTH],
+            message.author.bot,
+        )
+
+    def __repr__(self):
+        return f"<MessageRecord id={self.id} channel_id={self.channel_id} author_id={self.author_id}>"
+
+
+class MessageIndex:
+    """
+    A ring buffer of MessageRecords per channel.
+
+    Counters:
+        hits: Records served from the index.
+        misses: Records that had to be fetched from history.
+    """
+
+    def __init__(
+        self,
+        *,
+        channel_size: int = MESSAGE_INDEX_CHANNEL_SIZE,
+        max_channels: int = MESSAGE_INDEX_MAX_CHANNELS,
+    ):
+        self.channel_size = channel_size
+        self.max_channels = max_channels
+
+        self.channels: OrderedDict[int, deque] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(len(records) for records in self.channels.values())
+
+    def add(self, message: discord.Message) -> None:
+        channel_id = message.channel.id
+
+        records = self.channels.get(channel_id)
+        if records is None:
+            records = self.channels[channel_id] = deque(maxlen=self.channel_size)
+
+            if len(self.channels) > self.max_channels:
+                self.channels.popitem(last=False)
+        else:
+            self.channels.move_to_end(channel_id)
+
+        records.append(MessageRecord.from_message(message))
+
+    def remove(self, channel_id: int, message_ids) -> None:
+        """
+        Drop deleted messages from a channel.
+        """
+
+        records = self.channels.get(channel_id)
+        if not records:
+            return
+
+        message_ids = set(message_ids)
+        kept = [record for record in records if record.id not in message_ids]
+
+        if len(kept) != len(records):
+            records.clear()
+            records.extend(kept)
+
+    def edit(self, channel_id: int, message_id: int, content: str) -> None:
+        records = self.channels.get(channel_id)
+        if not records:
+            return
+
+        # Edits are almost always to recent messages, search from the newest
+        for record in reversed(records):
+            if record.id == message_id:
+                record.prefix = content[:MESSAGE_INDEX_PREFIX_LENGTH]
+                return
+
+    def clear(self) -> None:
+        """
+        Forget everything, used when events may have been missed (a new gateway session).
+        """
+
+        self.channels.clear()
+
+    async def recent(self, channel: discord.abc.Messageable, limit: int):
+        """
+        Yield records for the newest limit messages in a channel, newest first.
+
+        Served from the index where possible, the rest comes from channel.history().
+        """
+
+        records = self.channels.get(channel.id, ())
+
+        yielded = 0
+        oldest = None
+        for record in reversed(records):
+            if yielded >= limit:
+                return
+
+            yield record
+            yielded += 1
+            self.hits += 1
+            oldest = record
+
+        if yielded >= limit:
+            return
+
+        before = discord.Object(id=oldest.id) if oldest is not None else None
+
+        async for message in channel.history(limit=limit - yielded, before=before):
+            self.misses += 1
+            yield MessageRecord.from_message(message)
+
+    def age(self, record: MessageRecord) -> float:
+        """
+        How old a record is, in seconds.
+        """
+
+        return (datetime.now(timezone.utc) - record.created_at).total_seconds()
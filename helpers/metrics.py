@@ -0,0 +1,189 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for in-process runtime metrics.
+
+Everything writes into the METRICS registry, recording is an append to a bounded deque so it can be
+called from hot paths (and from pymongo's threads). The numbers are only crunched when someone asks,
+e.g. the !perf command.
+"""
+
+# Import the required modules
+
+# Python standard library
+from collections import deque
+import asyncio
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Callable
+
+# Third-party libraries
+from pymongo import monitoring
+
+# Constants
+
+# How far back timings are kept (seconds)
+METRICS_WINDOW = 3600
+
+# Most samples kept per timing, the oldest are dropped first
+METRICS_MAX_SAMPLES = 10_000
+
+# How often the event loop lag is sampled (seconds)
+LOOP_LAG_INTERVAL = 0.5
+
+# Classes
+
+
+class Timing:
+    """
+    Recent samples of one timing, in milliseconds.
+    """
+
+    __slots__ = ("samples",)
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES):
+        # (monotonic time, value, label)
+        self.samples = deque(maxlen=max_samples)
+
+    def record(self, value: float, label: str = None) -> None:  # type: ignore
+        self.samples.append((time.monotonic(), value, label))
+
+    def window(self, seconds: float = METRICS_WINDOW) -> list:
+        cutoff = time.monotonic() - seconds
+
+        # Copy first, other threads may be appending
+        return [sample for sample in list(self.samples) if sample[0] >= cutoff]
+
+    def percentiles(
+        self, seconds: float = METRICS_WINDOW, points=(50, 95, 99)
+    ) -> dict[int, float]:
+        """
+        Nearest-rank percentiles over the window, empty if there are no samples.
+        """
+
+        values = sorted(sample[1] for sample in self.window(seconds))
+        if not values:
+            return {}
+
+        return {
+            point: values[
+                min(len(values) - 1, max(0, -(-point * len(values) // 100) - 1))
+            ]
+            for point in points
+        }
+
+    def count(self, seconds: float = METRICS_WINDOW) -> int:
+        return len(self.window(seconds))
+
+    def slowest(self, seconds: float = METRICS_WINDOW, limit: int = 5) -> list:
+        """
+        The labels with the highest single sample in the window, as (label, max, count).
+        """
+
+        by_label: dict[str, list] = {}
+        for _, value, label in self.window(seconds):
+            entry = by_label.setdefault(label, [0.0, 0])
+            entry[0] = max(entry[0], value)
+            entry[1] += 1
+
+        return sorted(
+            ((label, peak, count) for label, (peak, count) in by_label.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:limit]
+
+
+class MetricsRegistry:
+    """
+    Named timings plus cache size callbacks.
+
+    Cogs register their caches with register_cache(name, lambda: len(self.cache)),
+    the callback is only called when the metrics are read.
+    """
+
+    def __init__(self):
+        self.timings: dict[str, Timing] = {}
+        self.caches: dict[str, Callable[[], int]] = {}
+        self.started_at = time.monotonic()
+
+        self._lock = threading.Lock()
+
+    def timing(self, name: str) -> Timing:
+        timing = self.timings.get(name)
+        if timing is None:
+            with self._lock:
+                timing = self.timings.setdefault(name, Timing())
+        return timing
+
+    def record(self, name: str, value: float, label: str = None) -> None:  # type: ignore
+        self.timing(name).record(value, label)
+
+    def register_cache(self, name: str, size: Callable[[], int]) -> None:
+        self.caches[name] = size
+
+    def unregister_cache(self, name: str) -> None:
+        self.caches.pop(name, None)
+
+    def cache_sizes(self) -> dict[str, int]:
+        sizes = {}
+        for name, size in list(self.caches.items()):
+            try:
+                sizes[name] = size()
+            except Exception:
+                sizes[name] = -1
+        return sizes
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Records the latency of every MongoDB command, registered on the MongoClient.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        METRICS.record("mongo", event.duration_micros / 1000, event.command_name)
+
+    def failed(self, event):
+        METRICS.record(
+            "mongo", event.duration_micros / 1000, f"{event.command_name} (failed)"
+        )
+
+
+# Functions
+
+
+def rss_bytes() -> int:
+    """
+    Current resident set size, or the peak where /proc isn't available.
+    """
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """
+    Sample how late the event loop wakes up from a sleep, run as a task.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        METRICS.record("loop_lag", max(0.0, loop.time() - start - interval) * 1000)
+
+
+# The registry used by the bot
+METRICS = MetricsRegistry()
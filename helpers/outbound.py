@@ -0,0 +1,295 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for queueing outbound webhook messages per channel.
+
+Each channel gets its own queue and worker task, so a rate limited channel never holds up another.
+Workers honour Discord's retry_after and rate limit bucket headers, back off with jitter on 5xx errors,
+and move messages that can't be delivered to a dead-letter list.
+"""
+
+# Import the required modules
+
+# Python standard library
+from collections import deque
+from datetime import datetime
+import asyncio
+import random
+
+# Third-party libraries
+import aiohttp
+import discord
+
+# Helpers
+from helpers.logs import RICKLOG_WEBHOOK
+
+# Constants
+
+# Maximum number of messages waiting in a single channel's queue
+OUTBOUND_QUEUE_SIZE = 100
+
+# Attempts made for a message before it is dead-lettered
+OUTBOUND_MAX_ATTEMPTS = 5
+
+# Exponential backoff for 5xx and network errors (seconds)
+OUTBOUND_BACKOFF_BASE = 1.0
+OUTBOUND_BACKOFF_CAP = 30.0
+
+# Workers exit after this long without messages (seconds)
+OUTBOUND_WORKER_IDLE_TIMEOUT = 60.0
+
+# Number of dead-lettered messages kept for inspection
+OUTBOUND_DEAD_LETTER_LIMIT = 100
+
+# Functions
+
+
+def _header_float(e: discord.HTTPException, name: str):
+    """
+    Read a float header from the response attached to an HTTPException.
+    """
+
+    headers = getattr(e.response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        return float(headers.get(name))  # type: ignore
+    except (TypeError, ValueError):
+        return None
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Fire and forget callers never await the future, failures are already logged
+    if not future.cancelled():
+        future.exception()
+
+
+# Classes
+
+
+class OutboundMessage:
+    __slots__ = ("kwargs", "future", "attempts", "enqueued_at")
+
+    def __init__(self, kwargs: dict, future: asyncio.Future):
+        self.kwargs = kwargs
+        self.future = future
+        self.attempts = 0
+        self.enqueued_at = datetime.now()
+
+
+class OutboundQueues:
+    """
+    Per-channel webhook send queues, owned by RickBot.
+
+    Metrics:
+        sent: Messages delivered.
+        retried: Send attempts that were retried.
+        rate_limited: Retries caused by a 429.
+        dead_lettered: Messages given up on.
+        overflowed: Messages rejected because a channel's queue was full.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self.queues: dict[int, asyncio.Queue] = {}
+        self.workers: dict[int, asyncio.Task] = {}
+
+        self.dead_letters: deque = deque(maxlen=OUTBOUND_DEAD_LETTER_LIMIT)
+        self.metrics = {
+            "sent": 0,
+            "retried": 0,
+            "rate_limited": 0,
+            "dead_lettered": 0,
+            "overflowed": 0,
+        }
+
+        self._inflight = 0
+        self._closing = False
+
+    def submit(self, channel: discord.TextChannel, **kwargs) -> asyncio.Future:
+        """
+        Queue a message for a channel and return a future for the sent message.
+
+        The future can be awaited or ignored.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+
+        if self._closing:
+            future.set_exception(RuntimeError("The outbound queue is shutting down."))
+            return future
+
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+
+        try:
+            queue.put_nowait(OutboundMessage(kwargs, future))
+        except asyncio.QueueFull:
+            self.metrics["overflowed"] += 1
+            RICKLOG_WEBHOOK.warning(
+                f"Outbound queue for channel {channel} is full ({OUTBOUND_QUEUE_SIZE}), dropping message.",
+                extra={"channel_id": channel.id},
+            )
+            future.set_exception(asyncio.QueueFull())
+            return future
+
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.create_task(
+                self._worker(channel, queue), name=f"outbound: {channel.id}"
+            )
+
+        return future
+
+    def pending(self) -> int:
+        """
+        The number of messages waiting across all channels.
+        """
+
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    async def close(self, timeout: float = 10.0) -> int:
+        """
+        Stop accepting messages and wait for queued ones to be sent.
+
+        Returns the number of messages that were dropped because the timeout was hit.
+        """
+
+        self._closing = True
+
+        # Wait for queued and in-flight messages, idle workers are just cancelled
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self.pending() or self._inflight) and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+
+        for task in list(self.workers.values()):
+            task.cancel()
+
+        dropped = self._inflight
+        for queue in self.queues.values():
+            while not queue.empty():
+                message: OutboundMessage = queue.get_nowait()
+                if not message.future.done():
+                    message.future.cancel()
+                dropped += 1
+
+        return dropped
+
+    async def _worker(self, channel: discord.TextChannel, queue: asyncio.Queue):
+        try:
+            while True:
+                try:
+                    message: OutboundMessage = await asyncio.wait_for(
+                        queue.get(), OUTBOUND_WORKER_IDLE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        break
+                    continue
+
+                self._inflight += 1
+                try:
+                    await self._deliver(channel, message)
+                except Exception as e:
+                    # Anything _deliver doesn't expect fails this message, not the channel's queue
+                    self._dead_letter(channel, message, e)
+                finally:
+                    self._inflight -= 1
+        finally:
+            if self.workers.get(channel.id) is asyncio.current_task():
+                del self.workers[channel.id]
+                if queue.empty():
+                    self.queues.pop(channel.id, None)
+
+    async def _deliver(self, channel: discord.TextChannel, message: OutboundMessage):
+        kwargs = {"wait": True, **message.kwargs}
+
+        while True:
+            message.attempts += 1
+            delay = None
+            bucket_delay = 0.0
+
+            try:
+                webhook = await self.bot.grab_channel_webhook(channel)
+                sent = await webhook.send(**kwargs)
+
+            except discord.NotFound as e:
+                # The webhook was deleted, look it up again and retry straight away
+                self.bot.invalidate_channel_webhook(channel.id)
+                error, delay = e, 0
+
+            except discord.HTTPException as e:
+                error = e
+
+                if e.status == 429:
+                    self.metrics["rate_limited"] += 1
+                    delay = _header_float(e, "Retry-After") or OUTBOUND_BACKOFF_BASE
+                elif e.status >= 500:
+                    delay = self._backoff(message.attempts)
+
+                # Respect the bucket even when the failure wasn't a 429
+                if _header_float(e, "X-RateLimit-Remaining") == 0:
+                    bucket_delay = _header_float(e, "X-RateLimit-Reset-After") or 0
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                error, delay = e, self._backoff(message.attempts)
+
+            else:
+                self.metrics["sent"] += 1
+                if not message.future.done():
+                    message.future.set_result(sent)
+                return
+
+            # Anything without a delay (403, 400, ...) won't succeed on a retry
+            if delay is None or message.attempts >= OUTBOUND_MAX_ATTEMPTS:
+                self._dead_letter(channel, message, error)
+
+                # Don't let the next message in this channel run into the same bucket
+                if bucket_delay:
+                    await asyncio.sleep(bucket_delay)
+                return
+
+            delay = max(delay, bucket_delay)
+
+            self.metrics["retried"] += 1
+            RICKLOG_WEBHOOK.warning(
+                f"Failed to send webhook message to channel {channel} on attempt ({message.attempts}), retrying in {delay:.2f}s: {error}",
+                extra={"channel_id": channel.id},
+            )
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter, so workers that failed together don't retry together
+        return random.uniform(
+            0, min(OUTBOUND_BACKOFF_CAP, OUTBOUND_BACKOFF_BASE * 2**attempt)
+        )
+
+    def _dead_letter(
+        self, channel: discord.TextChannel, message: OutboundMessage, error: Exception
+    ):
+        self.metrics["dead_lettered"] += 1
+        self.dead_letters.append(
+            {
+                "channel_id": channel.id,
+                "attempts": message.attempts,
+                "error": str(error),
+                "enqueued_at": message.enqueued_at,
+                "failed_at": datetime.now(),
+                "content": (message.kwargs.get("content") or "")[:100],
+                "embeds": len(message.kwargs.get("embeds") or [])
+                + (1 if message.kwargs.get("embed") else 0),
+            }
+        )
+
+        RICKLOG_WEBHOOK.error(
+            f"Giving up on webhook message to channel {channel} after {message.attempts} attempt(s): {error}",
+            extra={"channel_id": channel.id},
+        )
+
+        if not message.future.done():
+            message.future.set_exception(error)
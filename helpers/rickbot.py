@@ -10,9 +10,6 @@ RickBot is RickBot, and RickBot is perfect. No need to change anything.
 
 # Import the required modules
 
-# Python standard library
-import glob
-
 # Third-party modules
 from termcolor import colored
 
@@ -25,23 +22,22 @@ from helpers.logs import RICKLOG
 # Functions
 
 
-def display_error_logs_if_found_in_error_folder() -> None:
-    errors = 0
-    for _ in glob.glob("errors/*.txt"):  # type: ignore
-        errors += 1
+async def display_error_logs_if_found_in_error_folder(bot: Bot) -> None:
+    # A single indexed count, no need to walk the errors folder
+    errors = await bot.error_reporter.unchecked_count()  # type: ignore
 
     print("\n")
 
     if errors > 0:
         RICKLOG.critical(
-            f"Found {colored(errors, 'red', attrs=['bold', 'underline'])} unchecked error logs in the errors folder. If you have check these errors please delete them."
+            f"Found {colored(errors, 'red', attrs=['bold', 'underline'])} unchecked errors. If you have checked these errors please acknowledge them with the errors ack command."
         )
         RICKLOG.info(
-            f"Please check the error logs in the errors folder for more information."
+            f"Please check the errors command or the archive in the errors folder for more information."
         )
 
 
-def rickbot_start_msg(bot: Bot) -> None:
+async def rickbot_start_msg(bot: Bot) -> None:
     """
     Print a message to the console when the bot is ready.
     """
@@ -62,7 +58,32 @@ def rickbot_start_msg(bot: Bot) -> None:
         f'Loaded {colored(len(bot.cogs), "light_cyan", attrs=["bold", "underline"])} cogs.'
     )
 
-    display_error_logs_if_found_in_error_folder()
+    await display_error_logs_if_found_in_error_folder(bot)
+
+
+def log_startup_report(bot: Bot) -> None:
+    """
+    Log how long each cog took to import and set up, slowest first.
+    """
+
+    report = bot.cog_load_report  # type: ignore
+    loaded = sum(1 for entry in report.values() if entry["status"] == "loaded")
+
+    RICKLOG.info(
+        f'Startup report: {colored(f"{loaded}/{len(report)}", "light_cyan", attrs=["bold", "underline"])} cogs loaded in {colored(f"{bot.cog_load_time * 1000:.0f}ms", "light_cyan", attrs=["bold", "underline"])}.'  # type: ignore
+    )
+
+    for cog_name, entry in sorted(
+        report.items(),
+        key=lambda item: item[1]["import"] + item[1]["setup"],
+        reverse=True,
+    ):
+        line = f"{cog_name:<45} import {entry['import'] * 1000:7.1f}ms  setup {entry['setup'] * 1000:7.1f}ms"
+
+        if entry["status"] == "failed":
+            RICKLOG.warning(f"{line}  {colored('FAILED', 'red')}: {entry['error']}")
+        else:
+            RICKLOG.info(line)
 
 
 # Constants
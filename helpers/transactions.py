@@ -0,0 +1,200 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for logging money transactions to the transactions webhook.
+
+Money cogs enqueue their transaction embeds instead of sending them directly,
+a background flusher packs up to 10 embeds into a single webhook message.
+"""
+
+# Import the required modules
+
+# Python standard library
+import asyncio
+
+# Third-party libraries
+import aiohttp
+import discord
+
+# Helpers
+from helpers.logs import RICKLOG_WEBHOOK
+
+# Config
+from helpers.config import get_config
+
+# Constants
+
+# Discord allows at most 10 embeds per message
+TRANSACTION_LOG_BATCH_SIZE = 10
+
+# How long the flusher waits for a batch to fill before sending it anyway (seconds)
+TRANSACTION_LOG_FLUSH_INTERVAL = 2.0
+
+# Maximum number of embeds waiting to be sent, anything over this is dropped
+TRANSACTION_LOG_QUEUE_SIZE = 1000
+
+# Classes
+
+
+class TransactionLogQueue:
+    """
+    A bounded queue of transaction embeds with a background flusher.
+
+    Counters:
+        sent: Embeds successfully delivered.
+        batches: Webhook messages sent.
+        overflowed: Embeds rejected because the queue was full.
+        dropped: Embeds lost because there was no webhook or the send failed.
+    """
+
+    def __init__(self, bot, *, maxsize: int = TRANSACTION_LOG_QUEUE_SIZE):
+        self.bot = bot
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+        self.sent = 0
+        self.batches = 0
+        self.overflowed = 0
+        self.dropped = 0
+
+        self._webhook = None
+        self._webhook_url = None
+        self._task = None
+        self._closing = False
+
+    @property
+    def webhook_url(self):
+        return get_config().transactions_webhook
+
+    def start(self) -> None:
+        """
+        Start the background flusher.
+        """
+
+        if self.webhook_url is None:
+            RICKLOG_WEBHOOK.critical(
+                "No webhook URL found for transaction logging. Transactions will not be logged."
+            )
+
+        self._task = asyncio.create_task(self._flusher())
+
+    def enqueue(self, embed: discord.Embed) -> bool:
+        """
+        Queue a transaction embed to be sent, never blocks.
+
+        Returns False if the embed was not queued.
+        """
+
+        if self._closing or self.webhook_url is None:
+            self.dropped += 1
+            return False
+
+        try:
+            self.queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            RICKLOG_WEBHOOK.warning(
+                f"Transaction log queue is full ({self.queue.maxsize}), dropping a transaction embed."
+            )
+            return False
+
+        return True
+
+    async def close(self) -> None:
+        """
+        Stop accepting embeds and flush everything that is still queued.
+        """
+
+        self._closing = True
+
+        if self._task is None:
+            return
+
+        try:
+            # Wake the flusher if it is waiting on an empty queue
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+        await self._task
+
+    async def _flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        batch = []
+
+        while not self._closing:
+            embed = await self.queue.get()
+            batch = [] if embed is None else [embed]
+
+            # Keep collecting until the batch is full or the interval has passed
+            deadline = loop.time() + TRANSACTION_LOG_FLUSH_INTERVAL
+            while len(batch) < TRANSACTION_LOG_BATCH_SIZE and not self._closing:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    embed = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+                if embed is not None:
+                    batch.append(embed)
+
+            if self._closing:
+                break
+
+            if batch:
+                await self._send(batch)
+                batch = []
+
+        # Shutting down, send whatever is left
+        while not self.queue.empty():
+            embed = self.queue.get_nowait()
+            if embed is not None:
+                batch.append(embed)
+
+        for i in range(0, len(batch), TRANSACTION_LOG_BATCH_SIZE):
+            await self._send(batch[i : i + TRANSACTION_LOG_BATCH_SIZE])
+
+    async def _send(self, batch: list) -> None:
+        webhook_url = self.webhook_url
+
+        if webhook_url is None:
+            self.dropped += len(batch)
+            return
+
+        if self._webhook is None or self._webhook_url != webhook_url:
+            self._webhook = discord.Webhook.from_url(
+                webhook_url, session=self.bot.session
+            )
+            self._webhook_url = webhook_url
+
+        try:
+            await self._webhook.send(
+                username="Better Hood Money Transactions",
+                avatar_url=self.bot.user.display_avatar.url,
+                embeds=batch,
+            )
+        except (
+            discord.HTTPException,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            OSError,
+            ValueError,
+        ) as e:
+            self.dropped += len(batch)
+            RICKLOG_WEBHOOK.error(
+                f"Failed to send {len(batch)} transaction log embed(s): {e}"
+            )
+        except Exception:
+            # Anything else must not end the flusher, the queue would fill up and overflow
+            self.dropped += len(batch)
+            RICKLOG_WEBHOOK.exception(
+                f"Unexpected error sending {len(batch)} transaction log embed(s)"
+            )
+        else:
+            self.sent += len(batch)
+            self.batches += 1
@@ -0,0 +1,261 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for finding out what blocks the event loop.
+
+Commands, listeners and slash commands run inside track_operation(), which puts a label in the
+current_operation context variable (and a task -> label map the watchdog thread can read).
+The event loop beats a heartbeat, a watchdog thread notices when it stops, grabs the loop thread's
+stack and the label of the running task, and records the stall against that label once the loop recovers.
+"""
+
+# Import the required modules
+
+# Python standard library
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+# Helpers
+from helpers.logs import RICKLOG_BG
+
+# Constants
+
+# A stall at least this long is recorded (seconds)
+WATCHDOG_THRESHOLD = 0.25
+
+# How often the loop beats and the watchdog checks (seconds)
+WATCHDOG_INTERVAL = 0.05
+
+# Frames kept from each stack sample
+WATCHDOG_STACK_DEPTH = 12
+
+# Label used when a stall happens outside any tracked operation
+UNTRACKED = "untracked"
+
+# What is running in the current task, e.g. "command daily (Money_DailyCommands)"
+current_operation: ContextVar[str] = ContextVar("current_operation", default=None)  # type: ignore
+
+# Task -> label, contextvars can't be read from another thread
+_task_operations: dict = {}
+
+# Functions
+
+
+@contextmanager
+def track_operation(label: str):
+    """
+    Attribute everything run inside the block (in this task) to label.
+    """
+
+    token = current_operation.set(label)
+
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+
+    previous = _task_operations.get(task)
+    if task is not None:
+        _task_operations[task] = label
+
+    try:
+        yield
+    finally:
+        current_operation.reset(token)
+
+        if task is not None:
+            if previous is None:
+                _task_operations.pop(task, None)
+            else:
+                _task_operations[task] = previous
+
+
+def describe_callable(function) -> str:
+    """
+    "name (CogClass)" for a bound cog method, the qualified name otherwise.
+    """
+
+    owner = getattr(function, "__self__", None)
+    name = getattr(function, "__name__", repr(function))
+
+    if owner is not None:
+        return f"{name} ({type(owner).__name__})"
+
+    return getattr(function, "__qualname__", name)
+
+
+# Classes
+
+
+class Stall:
+    """
+    Stalls attributed to one label.
+    """
+
+    __slots__ = ("label", "count", "total", "worst", "stack", "last_seen")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.stack: list[str] = []
+        self.last_seen = 0.0
+
+
+class LoopWatchdog:
+    """
+    Watches an event loop from a thread and records what was running when it stalled.
+    """
+
+    def __init__(
+        self,
+        threshold: float = WATCHDOG_THRESHOLD,
+        interval: float = WATCHDOG_INTERVAL,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+
+        self.stalls: dict[str, Stall] = {}
+
+        # Stalls are recorded on the watchdog thread and read on the event loop
+        self._stalls_lock = threading.Lock()
+
+        self._loop: asyncio.AbstractEventLoop = None  # type: ignore
+        self._loop_thread_id: int = None  # type: ignore
+        self._beat = time.monotonic()
+        self._beat_handle: asyncio.TimerHandle = None  # type: ignore
+        self._thread: threading.Thread = None  # type: ignore
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """
+        Start beating on the running loop and start the watchdog thread.
+        """
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+
+        self._heartbeat()
+
+        self._thread = threading.Thread(
+            target=self._watch, name="rickbot-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._beat_handle is not None:
+            self._beat_handle.cancel()
+
+    def _heartbeat(self) -> None:
+        self._beat = time.monotonic()
+        self._beat_handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self) -> None:
+        stalled_since = None
+        label = stack = None
+
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            lag = time.monotonic() - beat - self.interval
+
+            if stalled_since is not None and beat != stalled_since:
+                # The loop is beating again, the stall lasted roughly until this beat
+                self.record(label, max(0.0, beat - stalled_since - self.interval), stack)  # type: ignore
+                stalled_since = None
+
+            if stalled_since is None and lag >= self.threshold:
+                # A new stall, sample it while it is still happening
+                stalled_since = beat
+                label, stack = self.sample()
+
+    def sample(self) -> tuple:
+        """
+        What the loop thread is doing right now, as (label, stack lines).
+        """
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-WATCHDOG_STACK_DEPTH:] if frame else []
+
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+
+        label = _task_operations.get(task) if task is not None else None
+
+        if label is None:
+            # Fall back to the innermost cog frame, if the stall is in a cog at all
+            while frame is not None:
+                filename = frame.f_code.co_filename
+                if f"{os.sep}cogs{os.sep}" in filename:
+                    label = f"{UNTRACKED} ({os.path.basename(filename)}:{frame.f_code.co_name})"
+                    break
+                frame = frame.f_back
+            else:
+                label = UNTRACKED
+
+        return label, stack
+
+    def record(self, label: str, duration: float, stack: list) -> None:
+        with self._stalls_lock:
+            stall = self.stalls.get(label)
+            if stall is None:
+                stall = self.stalls[label] = Stall(label)
+
+            stall.count += 1
+            stall.total += duration
+            stall.worst = max(stall.worst, duration)
+            stall.stack = stack
+            stall.last_seen = time.time()
+
+        RICKLOG_BG.warning(
+            f"Event loop blocked for {duration * 1000:.0f}ms by {label}.\n"
+            + "".join(stack).rstrip()
+        )
+
+    def offenders(self, limit: int = 10) -> list[Stall]:
+        """
+        The labels that blocked the loop the longest in total.
+        """
+
+        with self._stalls_lock:
+            return sorted(
+                self.stalls.values(), key=lambda stall: stall.total, reverse=True
+            )[:limit]
+
+
+if __name__ == "__main__":
+    # Block the loop from a "command" and check the stall is attributed to it
+
+    async def main():
+        watchdog = LoopWatchdog()
+        watchdog.start()
+
+        async def blocking_command():
+            with track_operation("command example (ExampleCog)"):
+                await asyncio.sleep(0.1)
+                time.sleep(0.5)
+
+        await asyncio.gather(blocking_command(), asyncio.sleep(1))
+        time.sleep(0.3)
+        await asyncio.sleep(0.3)
+
+        watchdog.stop()
+
+        for stall in watchdog.offenders():
+            print(
+                f"{stall.label}: {stall.count} stall(s), worst {stall.worst * 1000:.0f}ms"
+            )
+
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+This is a helper for running CPU heavy work outside the event loop.
+
+With "workers": {"processes": N} in config.json, work submitted through WorkerPool.run runs in N worker processes,
+so it uses more than one core and can't stall the gateway. With 0 (the default) it runs in a thread instead.
+
+Only plain functions and picklable arguments can be sent to a worker (no discord.py objects),
+pass names and IDs and look the objects up again on the bot's side. Workers are spawned, not forked,
+so they don't inherit the bot's threads, sockets or MongoClient. helpers.db creates a client per process
+on first use if a worker ever needs one.
+"""
+
+# Import the required modules
+
+# Python standard library
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import signal
+
+# Constants
+
+DEFAULT_WORKER_PROCESSES = 0
+
+# Functions
+
+
+def _init_worker() -> None:
+    # The bot process handles Ctrl+C and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Pay for the slow imports once per worker, not on the first job
+    import fuzzywuzzy.process  # noqa: F401
+
+
+def best_match(query: str, choices: list[str]) -> str | None:
+    """
+    The choice closest to query, using fuzzywuzzy.
+    """
+
+    if not choices:
+        return None
+
+    # Imported on first use, fuzzywuzzy is slow to import and rarely needed
+    from fuzzywuzzy import process
+
+    match = process.extractOne(query, choices)
+    return match[0] if match else None
+
+
+# Classes
+
+
+class WorkerPool:
+    """
+    A process pool for CPU heavy functions, or a thread when no processes are configured.
+    """
+
+    def __init__(self, processes: int = DEFAULT_WORKER_PROCESSES):
+        self.processes = processes
+
+        self._executor: ProcessPoolExecutor = None  # type: ignore
+
+    @classmethod
+    def from_config(cls, config: dict) -> "WorkerPool":
+        return cls(int(config.get("processes", DEFAULT_WORKER_PROCESSES)))
+
+    def start(self) -> None:
+        if self.processes <= 0:
+            return
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+        # Imported here so workers importing this module don't set up the bot's logging
+        from helpers.logs import RICKLOG_MAIN
+
+        RICKLOG_MAIN.info(f"Started {self.processes} worker process(es).")
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in a worker process (or a thread) and return the result.
+        """
+
+        if self._executor is None:
+            return await asyncio.to_thread(fn, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, fn, *args
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+if __name__ == "__main__":
+    # Load test: fuzzy match a batch of queries against a few hundred role names with 0-4 worker processes
+    import os
+    import random
+    import string
+    import time
+
+    JOBS = 400
+
+    random.seed(0)
+    roles = [
+        "".join(random.choices(string.ascii_lowercase + " ", k=random.randint(5, 20)))
+        for _ in range(300)
+    ]
+    queries = [random.choice(roles)[:8] for _ in range(JOBS)]
+
+    async def load_test(processes: int) -> float:
+        pool = WorkerPool(processes)
+        pool.start()
+
+        # Warm up so process start-up isn't counted
+        await asyncio.gather(
+            *(pool.run(best_match, q, roles) for q in queries[: processes * 2 or 1])
+        )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(pool.run(best_match, q, roles) for q in queries))
+        elapsed = time.perf_counter() - start
+
+        pool.close()
+        return elapsed
+
+    print(f"{JOBS} fuzzy matches against {len(roles)} roles ({os.cpu_count()} CPUs)")
+    baseline = None
+    for processes in (0, 1, 2, 4):
+        elapsed = asyncio.run(load_test(processes))
+        baseline = baseline or elapsed
+        print(
+            f"  {processes} process(es): {JOBS / elapsed:8.1f} jobs/s  "
+            f"({baseline / elapsed:.2f}x)"
+        )
@@ -6,36 +6,70 @@ This is the main application file for RickBot.
 """
 
 # Python standard library
+from contextlib import contextmanager
 from datetime import datetime
 import asyncio
 import logging
 import glob
+import hashlib
+import json
+import os
+import time
 
 # Third-party libraries
+from pymongo.errors import PyMongoError
 from termcolor import colored
+import aiohttp
 
 # discord.py library
 from discord.ext import commands
+from discord import app_commands
 import discord
 
 # Helper files
 from helpers.logs import (
+    add_log_handler,
+    remove_log_handler,
     setup_discord_logging,
+    setup_json_logging,
     RICKLOG,
     RICKLOG_MAIN,
     RICKLOG_DISCORD,
     RICKLOG_WEBHOOK,
 )
-from helpers.rickbot import rickbot_start_msg
-from helpers.errors import handle_error
+from helpers.rickbot import rickbot_start_msg, log_startup_report
+from helpers.errors import handle_error, ErrorReporter
+from helpers.http import create_http_session
+from helpers.transactions import TransactionLogQueue
+from helpers.outbound import OutboundQueues
+from helpers.ledger import Ledger
+from helpers.cooldowns import COOLDOWNS
+from helpers.message_index import MessageIndex
+from helpers.metrics import METRICS, monitor_loop_lag
+from helpers.watchdog import LoopWatchdog, describe_callable, track_operation
+from helpers.workers import WorkerPool
+from helpers.log_forward import DiscordLogHandler
+from helpers.gateway import GatewayRecorder, check_listener_intents, client_options
+
+# Database
+from helpers import db
 
 # Configuration file
-from helpers.config import CONFIG
+from helpers.config import get_config, reload_config, subscribe, watch_config
 
 # Configurations (Not usally changed, so not in the config file)
 
 COMMAND_ERRORS_TO_IGNORE = (commands.CommandNotFound,)
 
+# Total time shutdown may take before whatever is left is dropped (seconds)
+SHUTDOWN_DEADLINE = 30
+
+# Longest shutdown waits for in-flight commands, the rest of the deadline is for flushing (seconds)
+SHUTDOWN_COMMAND_TIMEOUT = 15
+
+# Sent to anyone using a slash command while the bot is shutting down
+SHUTTING_DOWN_MESSAGE = "RickBot is restarting, please try again in a moment."
+
 # Custom exceptions
 
 
@@ -51,7 +85,7 @@ class WebhookFailedError(Exception):
 
 
 def get_prefix(bot, message):
-    return commands.when_mentioned_or(CONFIG["bot"]["prefix"])(bot, message)
+    return commands.when_mentioned_or(get_config().prefix)(bot, message)
 
 
 # Classes
@@ -62,6 +96,24 @@ class RickContext(commands.Context):
     pass
 
 
+# Define the custom CommandTree class, attributes slash commands for the loop watchdog
+class RickCommandTree(app_commands.CommandTree):
+    async def _call(self, interaction):
+        if self.client.shutting_down:
+            # Autocomplete can't be answered with a message, only with choices
+            if interaction.type == discord.InteractionType.autocomplete:
+                await interaction.response.autocomplete([])
+            else:
+                await interaction.response.send_message(
+                    SHUTTING_DOWN_MESSAGE, ephemeral=True
+                )
+            return
+
+        label = f"slash command /{interaction.data.get('name')}"
+        with track_operation(label), self.client.track_in_flight(label):
+            await super()._call(interaction)
+
+
 # Define the custom Bot class
 class RickBot(commands.Bot):
     def __init__(self):
@@ -70,49 +122,304 @@ class RickBot(commands.Bot):
             case_insensitive=True,
             strip_after_prefix=True,
             allowed_mentions=discord.AllowedMentions(everyone=False, roles=False),
-            intents=discord.Intents.all(),
+            tree_cls=RickCommandTree,
+            **client_options(get_config().config.get("gateway", {})),
         )
 
+        # Shared HTTP session for all non-Discord HTTP, created in setup_hook
+        self.session: aiohttp.ClientSession = None  # type: ignore
+
+        # Webhook cache used by send_to_channel, keyed by channel ID
+        self.channel_webhooks: dict[int, discord.Webhook] = {}
+        self._channel_webhook_locks: dict[int, asyncio.Lock] = {}
+
+        # Per-channel queues used by send_to_channel
+        self.outbound = OutboundQueues(self)
+
+        # Batched sender for money transaction logs
+        self.transaction_log = TransactionLogQueue(self)
+
+        # Background writer/uploader for unexpected error reports
+        self.error_reporter = ErrorReporter(self)
+
+        # Buffered writer for the money transaction ledger
+        self.ledger = Ledger()
+
+        # Compact record of recent messages per channel, used by cleanup instead of history calls
+        self.message_index = MessageIndex()
+
+        # Per-cog load status and timings, logged once after on_ready
+        self.cog_load_report: dict[str, dict] = {}
+        self.cog_load_time = 0.0
+        self._startup_reported = False
+
+        # Forwards warnings and errors to a Discord channel, set up in setup_hook if configured
+        self.log_forward: DiscordLogHandler = None  # type: ignore
+
+        # Writes raw gateway events to a file when gateway.record is configured
+        self.gateway_recorder: GatewayRecorder = None  # type: ignore
+
+        # Reloads the config when the config files change, started in setup_hook
+        self._config_watcher: asyncio.Task = None  # type: ignore
+
+        # Samples event loop lag into METRICS, started in setup_hook
+        self._loop_lag_monitor: asyncio.Task = None  # type: ignore
+
+        # Records what was running when the event loop stalls, started in setup_hook
+        self.watchdog = LoopWatchdog()
+
+        # Set once shutdown starts, no new commands are accepted after that
+        self.shutting_down = False
+
+        # Tasks running a command -> what they are running, drained on shutdown
+        self.in_flight: dict[asyncio.Task, str] = {}
+
+        # Write buffers flushed on shutdown, in order, before the outbound queues
+        self.shutdown_flushers: list[tuple] = []
+
+        # Worker processes for CPU heavy work (e.g. fuzzy matching), started in setup_hook
+        self.workers = WorkerPool.from_config(get_config().config.get("workers", {}))
+
+        self.register_cache_metrics()
+
         self.setup_logging()
         self.load_config()
 
+    def register_cache_metrics(self):
+        METRICS.register_cache(
+            "members", lambda: sum(len(guild.members) for guild in self.guilds)
+        )
+        METRICS.register_cache("users", lambda: len(self.users))
+        METRICS.register_cache("messages", lambda: len(self.cached_messages))
+        METRICS.register_cache("message_index", lambda: len(self.message_index))
+        METRICS.register_cache("outbound_pending", self.outbound.pending)
+
     def setup_logging(self):
         setup_discord_logging(logging.INFO)
+        setup_json_logging(get_config().config.path("logging.json", {}))
 
     def load_config(self):
-        if CONFIG["mode"] == "dev":
+        if get_config().mode == "dev":
             RICKLOG.setLevel(logging.DEBUG)
         else:
             RICKLOG.setLevel(logging.INFO)
 
     async def setup_hook(self):
+        self.session = create_http_session()
+        self._loop_lag_monitor = asyncio.create_task(monitor_loop_lag())
+        self.watchdog.start()
+        self.workers.start()
+        self.setup_log_forwarding()
+        await self.error_reporter.start()
+        self.transaction_log.start()
+
+        await asyncio.to_thread(self.ledger.ensure_indexes)
+        self.ledger.start()
+
+        await COOLDOWNS.start()
+
         await self.load_cogs()
+        check_listener_intents(self)
 
-    async def load_cogs(self):
-        for cog_folder in glob.glob("cogs/*"):
-            cogs_loaded_from_this_folder = 0
-            if not cog_folder.startswith("_"):
-                for filename in glob.glob(f"{cog_folder}/*.py"):
-                    if not filename.startswith("_"):
-                        cog_name = f"{filename[:-3].replace('/', '.')}"
-                        await self.load_extension(cog_name)
-                        cogs_loaded_from_this_folder += 1
+        record_config = get_config().config.path("gateway.record")
+        if record_config:
+            self.gateway_recorder = GatewayRecorder(
+                self, record_config["path"], record_config.get("limit", 50_000)
+            )
+            self.gateway_recorder.start()
+
+        subscribe(self.on_config_reload)
+        self._config_watcher = asyncio.create_task(watch_config())
 
-                        RICKLOG_MAIN.debug(f"Loaded cog: {cog_name}")
+        self.register_core_shutdown_flushers()
 
+    async def on_config_reload(self, old, new):
+        self.load_config()
+
+        if self.log_forward is not None and new.log_forward:
+            try:
+                self.log_forward.channel_id = int(new.log_forward["channel"])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        if self.is_ready() and old.config.bot.status != new.config.bot.status:
+            await self.set_status()
+
+    def setup_log_forwarding(self):
+        try:
+            forward_config = get_config().log_forward
+            channel_id = int(forward_config["channel"])
+        except (KeyError, TypeError, ValueError):
             RICKLOG_MAIN.info(
-                f"Loaded cog folder: {cog_folder} ({cogs_loaded_from_this_folder} cogs)"
+                "No log forwarding channel configured, warnings will only be logged locally."
             )
+            return
+
+        self.log_forward = DiscordLogHandler(
+            self, channel_id, forward_config.get("level", "WARNING").upper()
+        )
+        self.log_forward.start()
+        add_log_handler(self.log_forward)
+
+    def find_cogs(self) -> list[str]:
+        """
+        Find the module names of every cog under cogs/*.
+        """
+
+        cog_names = []
+
+        for cog_folder in sorted(glob.glob("cogs/*")):
+            if os.path.basename(cog_folder).startswith("_"):
+                continue
+
+            for filename in sorted(glob.glob(f"{cog_folder}/*.py")):
+                if os.path.basename(filename).startswith("_"):
+                    continue
+
+                cog_names.append(filename[:-3].replace(os.sep, "."))
+
+        return cog_names
+
+    async def load_cogs(self):
+        """
+        Load every cog concurrently.
+
+        If behaviour.continue_to_load_cogs_after_failure is set, a cog that fails is logged and skipped,
+        otherwise the first failure aborts startup once every cog has been tried.
+        """
+
+        continue_after_failure = (
+            get_config().config.behaviour.continue_to_load_cogs_after_failure
+        )
+
+        start = time.perf_counter()
+
+        cog_names = self.find_cogs()
+        results = await asyncio.gather(
+            *(self.load_cog(cog_name) for cog_name in cog_names),
+            return_exceptions=True,
+        )
+
+        self.cog_load_time = time.perf_counter() - start
+
+        failures = [
+            (cog_name, result)
+            for cog_name, result in zip(cog_names, results)
+            if isinstance(result, BaseException)
+        ]
+
+        for cog_name, error in failures:
+            RICKLOG_MAIN.error(f"Failed to load cog {cog_name}: {error}")
+
+        RICKLOG_MAIN.info(
+            f"Loaded {len(cog_names) - len(failures)}/{len(cog_names)} cogs in {self.cog_load_time * 1000:.0f}ms."
+        )
+
+        if failures and not continue_after_failure:
+            raise failures[0][1]
+
+    async def load_cog(self, cog_name: str):
+        """
+        Load a single cog and record how long its import and setup took.
+        """
+
+        report = self.cog_load_report[cog_name] = {
+            "status": "loading",
+            "import": 0.0,
+            "setup": 0.0,
+            "error": None,
+        }
+
+        start = time.perf_counter()
+
+        try:
+            await self.load_extension(cog_name)
+        except Exception as e:
+            report["status"] = "failed"
+            report["error"] = str(getattr(e, "original", e))
+            raise
+        else:
+            report["status"] = "loaded"
+            RICKLOG_MAIN.debug("Loaded cog: %s", cog_name)
+        finally:
+            # add_cog records the setup time, everything else was the import
+            report["import"] = max(time.perf_counter() - start - report["setup"], 0.0)
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs):
+        start = time.perf_counter()
+
+        try:
+            await super().add_cog(cog, **kwargs)
+        finally:
+            report = self.cog_load_report.get(type(cog).__module__)
+            if report is not None:
+                report["setup"] += time.perf_counter() - start
 
     async def get_context(self, message, *, cls=None):
         return await super().get_context(message, cls=RickContext)
 
-    async def on_ready(self):
-        # Register commands for the Better Hood server.
-        guild: discord.Guild = discord.Object(id=CONFIG["server_id"])
+    def tree_payload_hash(self, guild: discord.abc.Snowflake) -> str:
+        """
+        Hash the application command payload that would be synced to a guild.
+        """
+
+        payload = [command.to_dict() for command in self.tree.get_commands(guild=guild)]
+        payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+
+        return hashlib.sha256(
+            json.dumps(
+                {"application_id": self.application_id, "commands": payload},
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+    async def sync_tree(self, *, force: bool = False) -> bool:
+        """
+        Sync the application commands to the Better Hood server.
+
+        The payload hash of the last successful sync is kept in the state collection,
+        the sync is skipped if nothing changed unless force is set.
+
+        Returns True if the commands were synced.
+        """
+
+        guild = discord.Object(id=get_config().server_id)
         self.tree.copy_global_to(guild=guild)
+
+        payload_hash = self.tree_payload_hash(guild)
+        state_id = f"tree_sync:{guild.id}"
+
+        if not force:
+            state = await asyncio.to_thread(
+                db.state_collection.find_one, {"_id": state_id}
+            )
+            if state is not None and state.get("hash") == payload_hash:
+                RICKLOG_DISCORD.info("Application commands unchanged, skipping sync.")
+                return False
+
         await self.tree.sync(guild=guild)
 
+        await asyncio.to_thread(
+            db.state_collection.update_one,
+            {"_id": state_id},
+            {"$set": {"hash": payload_hash, "synced_at": datetime.now()}},
+            upsert=True,
+        )
+
+        RICKLOG_DISCORD.info(f"Application commands synced ({payload_hash[:12]}).")
+        return True
+
+    async def on_ready(self):
+        # A new session, anything sent while we were disconnected is missing from the index
+        self.message_index.clear()
+
+        # Register commands for the Better Hood server, only if they changed since the last sync
+        try:
+            await self.sync_tree()
+        except (discord.HTTPException, PyMongoError) as e:
+            RICKLOG_DISCORD.error(f"Failed to sync application commands: {e}")
+
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         RICKLOG_MAIN.info(
             f"RickBot started at {colored(current_time, 'light_cyan', attrs=['bold', 'underline'])}"
@@ -120,15 +427,21 @@ class RickBot(commands.Bot):
         RICKLOG_DISCORD.info("RickBot's Connection to Discord initialized.")
 
         await self.set_status()
-        rickbot_start_msg(self)
+        await rickbot_start_msg(self)
+
+        if not self._startup_reported:
+            self._startup_reported = True
+            log_startup_report(self)
 
     async def set_status(self):
         """
         Update the bot's status based on the configuration file.
         """
 
-        status_type = CONFIG["bot"]["status"]["type"]
-        message = CONFIG["bot"]["status"]["message"]
+        status = get_config().config.bot.status
+
+        status_type = status.type
+        message = status.message
 
         if status_type == "playing":
             await self.change_presence(activity=discord.Game(name=message))
@@ -148,12 +461,17 @@ class RickBot(commands.Bot):
             )
 
         elif status_type == "streaming":
-            url = CONFIG["bot"]["status"]["url"]
+            url = status.url
             await self.change_presence(
                 activity=discord.Streaming(name=message, url=url)
             )
 
     async def on_message(self, message):
+        self.message_index.add(message)
+
+        if self.shutting_down:
+            return
+
         # Process commands and check for mentions
         if (
             message.author == self.user
@@ -169,13 +487,68 @@ class RickBot(commands.Bot):
             f"<@{self.user.id}>"  # type: ignore
         ):
             await message.reply(
-                f"Hey there, {message.author.mention}! Use `{CONFIG['bot']['prefix']}help` to see what I can do.",
+                f"Hey there, {message.author.mention}! Use `{get_config().prefix}help` to see what I can do.",
                 mention_author=False,
             )
             return
 
         await self.process_commands(message)
 
+    async def on_raw_message_delete(self, payload):
+        self.message_index.remove(payload.channel_id, (payload.message_id,))
+
+    async def on_raw_bulk_message_delete(self, payload):
+        self.message_index.remove(payload.channel_id, payload.message_ids)
+
+    async def on_raw_message_edit(self, payload):
+        if "content" in payload.data:
+            self.message_index.edit(
+                payload.channel_id, payload.message_id, payload.data["content"]
+            )
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # Every listener runs in its own task, label it for the loop watchdog
+        with track_operation(f"listener {describe_callable(coro)}"):
+            await super()._run_event(coro, event_name, *args, **kwargs)
+
+    @contextmanager
+    def track_in_flight(self, label: str):
+        """
+        Count the current task as running a command until the block exits.
+        """
+
+        task = asyncio.current_task()
+        self.in_flight[task] = label  # type: ignore
+        try:
+            yield
+        finally:
+            self.in_flight.pop(task, None)  # type: ignore
+
+    async def invoke(self, ctx):
+        start = time.perf_counter()
+        try:
+            if ctx.command is not None:
+                label = f"command {ctx.command.qualified_name} ({ctx.command.cog_name})"
+                with track_operation(label), self.track_in_flight(label):
+                    await super().invoke(ctx)
+            else:
+                await super().invoke(ctx)
+        finally:
+            if ctx.command is not None:
+                METRICS.record(
+                    "commands",
+                    (time.perf_counter() - start) * 1000,
+                    ctx.command.qualified_name,
+                )
+
+    async def on_app_command_completion(self, interaction, command):
+        # Slash commands are timed from when Discord created the interaction
+        METRICS.record(
+            "commands",
+            (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000,
+            f"/{command.qualified_name}",
+        )
+
     async def on_command_error(self, ctx, error):
         # Error handling for commands without specific error handlers
         if hasattr(ctx.command, "on_error") or isinstance(
@@ -188,19 +561,140 @@ class RickBot(commands.Bot):
     async def start_bot(self):
         try:
             RICKLOG_MAIN.info("Starting RickBot...")
-            await self.start(CONFIG["bot"]["token"])
+            await self.start(get_config().config.bot.token)
         finally:
             RICKLOG_MAIN.info("RickBot has shut down gracefully.")
 
-    async def shutdown(self, signal):
-        """Gracefully shut down the bot."""
-        RICKLOG_MAIN.info(
-            f"Received exit signal {signal.name} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}..."
-        )
+    def register_shutdown_flusher(self, name: str, flush) -> None:
+        """
+        Register a write buffer to flush on shutdown.
+
+        flush is an async function, it may return a number of records dropped. Flushers run in the order
+        they were registered, before the outbound queues are drained.
+        """
+
+        self.shutdown_flushers.append((name, flush))
+
+    def register_core_shutdown_flushers(self) -> None:
+        async def flush_transaction_log():
+            await self.transaction_log.close()
+            return self.transaction_log.dropped
+
+        async def flush_ledger():
+            await self.ledger.close()
+            return len(self.ledger.buffer)
+
+        if self.gateway_recorder is not None:
+            self.register_shutdown_flusher(
+                "gateway recording", self.gateway_recorder.flush
+            )
+
+        self.register_shutdown_flusher("transaction logs", flush_transaction_log)
+        self.register_shutdown_flusher("ledger", flush_ledger)
+        self.register_shutdown_flusher("cooldowns", COOLDOWNS.close)
+        self.register_shutdown_flusher("error reports", self.error_reporter.close)
+
+        if self.log_forward is not None:
+
+            async def flush_log_forward():
+                remove_log_handler(self.log_forward)
+                await self.log_forward.drain()
+
+            self.register_shutdown_flusher("log forwarding", flush_log_forward)
+
+    async def shutdown(self, signal=None):
+        """
+        Gracefully shut down the bot, in phases, within SHUTDOWN_DEADLINE:
+            1. stop accepting new commands,
+            2. wait for in-flight commands,
+            3. flush write buffers, then the outbound queues,
+            4. close the gateway, the database client and the HTTP session.
+        Anything still pending when the deadline is hit is logged as dropped.
+        """
+
+        if self.shutting_down:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SHUTDOWN_DEADLINE
+
+        if signal is not None:
+            RICKLOG_MAIN.info(
+                f"Received exit signal {signal.name} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}..."
+            )
+
+        # Phase 1: stop accepting new commands and stop background work
+        self.shutting_down = True
+
+        if self._config_watcher is not None:
+            self._config_watcher.cancel()
+
+        if self._loop_lag_monitor is not None:
+            self._loop_lag_monitor.cancel()
+
+        self.watchdog.stop()
+
+        # Phase 2: wait for in-flight commands
+        if self.in_flight:
+            RICKLOG_MAIN.info(
+                f"Waiting for {len(self.in_flight)} in-flight command(s)..."
+            )
+            _, pending = await asyncio.wait(
+                list(self.in_flight),
+                timeout=min(SHUTDOWN_COMMAND_TIMEOUT, deadline - loop.time()),
+            )
+            if pending:
+                RICKLOG_MAIN.warning(
+                    f"Shutdown deadline hit, {len(pending)} command(s) still running: "
+                    + ", ".join(self.in_flight.get(task, "unknown") for task in pending)  # type: ignore
+                )
+            else:
+                RICKLOG_MAIN.info("In-flight commands finished.")
+
+        self.workers.close()
+
+        # Phase 3: flush write buffers, then send whatever they queued
+        for name, flush in self.shutdown_flushers:
+            RICKLOG_MAIN.info(f"Flushing {name}...")
+            try:
+                dropped = await asyncio.wait_for(
+                    flush(), max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                RICKLOG_MAIN.warning(
+                    f"Shutdown deadline hit while flushing {name}, the rest was dropped."
+                )
+                continue
+            except Exception as e:
+                RICKLOG_MAIN.error(f"Failed to flush {name}: {e}")
+                continue
+
+            if dropped:
+                RICKLOG_MAIN.warning(f"Flushed {name} ({dropped} dropped).")
+            else:
+                RICKLOG_MAIN.info(f"Flushed {name}.")
+
+        RICKLOG_WEBHOOK.info("Sending queued webhook messages...")
+        dropped = await self.outbound.close(timeout=max(0.0, deadline - loop.time()))
+        if dropped:
+            RICKLOG_WEBHOOK.warning(
+                f"Queued webhook messages sent ({dropped} dropped)."
+            )
+        else:
+            RICKLOG_WEBHOOK.info("Queued webhook messages sent.")
+
+        # Phase 4: close connections
         RICKLOG_DISCORD.info("Closing Discord connection...")
         await self.close()
         RICKLOG_DISCORD.info("Discord connection closed.")
 
+        await asyncio.to_thread(db.close_mongo_client)
+        RICKLOG_MAIN.info("Database connection closed.")
+
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            RICKLOG_MAIN.info("HTTP session closed.")
+
     async def on_connect(self):
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         RICKLOG_DISCORD.info(f"RickBot connected to Discord at {current_time}.")
@@ -225,52 +719,82 @@ class RickBot(commands.Bot):
         Grabs the first webhook found in a channel.
         For the webhooks it finds it has to ensure it was created by the bot.
         Otherwise (or if not found) it creates a new webhook.
+
+        The webhook is cached per channel, so this only hits the API on a cache miss.
+        A per-channel lock stops concurrent callers from creating duplicate webhooks.
         """
 
-        # Grab all webhooks in the channel
-        webhooks = await channel.webhooks()
+        webhook = self.channel_webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+
+        lock = self._channel_webhook_locks.setdefault(channel.id, asyncio.Lock())
+
+        async with lock:
+            # Another caller may have filled the cache while we were waiting
+            webhook = self.channel_webhooks.get(channel.id)
+            if webhook is not None:
+                return webhook
+
+            # Grab all webhooks in the channel
+            webhooks = await channel.webhooks()
+
+            # Find all webhooks created by the bot
+            bot_webhooks = [
+                webhook for webhook in webhooks if webhook.user == self.user
+            ]
+
+            # There should only be one webhook created by the bot
+            # If there are more than one, delete the extras
+            if len(bot_webhooks) > 1:
+                for webhook in bot_webhooks[1:]:
+                    await webhook.delete()
+
+            # If there are no webhooks created by the bot, create a new one
+            if not bot_webhooks:
+                webhook = await channel.create_webhook(
+                    name="BHB Logging",
+                    reason="Creating new webhook for logging.",
+                )
+            else:
+                webhook = bot_webhooks[0]
+
+            self.channel_webhooks[channel.id] = webhook
 
-        # Find all webhooks created by the bot
-        bot_webhooks = [webhook for webhook in webhooks if webhook.user == self.user]
+        return webhook
 
-        # There should only be one webhook created by the bot
-        # If there are more than one, delete the extras
-        if len(bot_webhooks) > 1:
-            for webhook in bot_webhooks[1:]:
-                await webhook.delete()
+    def invalidate_channel_webhook(self, channel_id: int) -> None:
+        """
+        Forget the cached webhook for a channel, the next send will look it up again.
+        """
 
-        # If there are no webhooks created by the bot, create a new one
-        if not bot_webhooks:
-            webhook = await channel.create_webhook(
-                name="BHB Logging",
-                reason="Creating new webhook for logging.",
+        if self.channel_webhooks.pop(channel_id, None) is not None:
+            RICKLOG_WEBHOOK.debug(
+                f"Invalidated cached webhook for channel {channel_id}"
             )
-        else:
-            webhook = bot_webhooks[0]
 
-        return webhook
+    async def on_webhooks_update(self, channel):
+        # A webhook in this channel was created, updated or deleted
+        self.invalidate_channel_webhook(channel.id)
 
     async def send_to_channel(
         self,
         channel: discord.TextChannel,
+        *,
+        wait: bool = False,
         **kwargs,
     ):
         """
         Sends a message to a channel using a webhook.
+
+        The message is queued on the channel's outbound queue and retried there.
+        By default this returns a future for the sent message straight away (fire and forget),
+        pass wait=True to wait for the message to be sent instead.
         """
 
-        # Grab the webhook for the channel
-        webhook = await self.grab_channel_webhook(channel)
+        future = self.outbound.submit(channel, **kwargs)
 
-        # Try to send the message
-        # Allow 3 attempts
+        if wait:
+            return await future
 
-        for attempt in range(3):
-            try:
-                await webhook.send(**kwargs)
-                return
-            except discord.HTTPException as e:
-                RICKLOG_WEBHOOK.error(
-                    f"Failed to send webhook message to channel {channel} on attempt ({str(attempt)}): {e}"
-                )
-                await asyncio.sleep(1)
+        return future
@@ -0,0 +1,139 @@
+"""
+(c) 2024 Zachariah Michael Lagden (All Rights Reserved)
+You may not use, copy, distribute, modify, or sell this code without the express permission of the author.
+
+Profiles RickBot's startup.
+
+Run with `python -m rickbot.startup_profile` from the bot's directory. Prints how long was spent in
+imports, loading the config, connecting to the database, loading cogs and waiting for the gateway to be ready.
+Pass --no-gateway to skip logging in to Discord.
+"""
+
+# Python standard library
+import asyncio
+import os
+import sys
+import time
+
+# Constants
+
+# How long to wait for on_ready before giving up (seconds)
+GATEWAY_READY_TIMEOUT = 60
+
+# Number of slowest cogs listed in the breakdown
+SLOWEST_COGS = 5
+
+# Functions
+
+
+def timed(phases: list, name: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    phases.append((name, time.perf_counter() - start))
+    return result
+
+
+async def timed_async(phases: list, name: str, coro):
+    start = time.perf_counter()
+    result = await coro
+    phases.append((name, time.perf_counter() - start))
+    return result
+
+
+async def profile(connect_gateway: bool = True) -> list:
+    phases = []
+
+    # Imports, config is imported (and loaded) by helpers.config so it's timed on its own first
+    timed(phases, "import discord.py", __import__, "discord.ext.commands")
+    timed(phases, "config load (and logging)", __import__, "helpers.config")
+    timed(phases, "import rickbot", __import__, "rickbot.main")
+
+    from helpers.db import get_mongo_client
+    from helpers.rickbot import log_startup_report
+    from rickbot.main import RickBot
+    from helpers.config import get_config
+
+    bot = timed(phases, "create bot", RickBot)
+
+    # Database, creating the client and the first round trip
+    client = await timed_async(phases, "db client", asyncio.to_thread(get_mongo_client))
+    await timed_async(
+        phases, "db connect (ping)", asyncio.to_thread(client.admin.command, "ping")
+    )
+
+    # Everything setup_hook does, including loading cogs
+    start = time.perf_counter()
+    await bot.setup_hook()
+    setup_time = time.perf_counter() - start
+    phases.append(("setup_hook (services)", setup_time - bot.cog_load_time))
+    phases.append(("cog load", bot.cog_load_time))
+
+    if connect_gateway:
+        # setup_hook already ran, don't run it again when logging in
+        async def no_setup_hook():
+            pass
+
+        bot.setup_hook = no_setup_hook
+
+        ready = asyncio.Event()
+
+        async def on_ready():
+            ready.set()
+
+        bot.add_listener(on_ready)
+
+        await timed_async(phases, "login", bot.login(get_config().config.bot.token))
+
+        connect = asyncio.create_task(bot.connect())
+        try:
+            await timed_async(
+                phases,
+                "gateway ready",
+                asyncio.wait_for(ready.wait(), GATEWAY_READY_TIMEOUT),
+            )
+        finally:
+            await bot.close()
+            connect.cancel()
+
+    print_report(phases, bot)
+    log_startup_report(bot)
+
+    # Stop everything setup_hook started (sync loops, worker pool, watchdog, config watcher...)
+    await bot.shutdown()
+
+    return phases
+
+
+def print_report(phases: list, bot) -> None:
+    total = sum(elapsed for _, elapsed in phases)
+
+    print()
+    print(f"{'Phase':<30} {'Time':>10} {'Share':>7}")
+    print("-" * 49)
+    for name, elapsed in phases:
+        share = elapsed / total * 100 if total else 0
+        print(f"{name:<30} {elapsed * 1000:>8.1f}ms {share:>6.1f}%")
+    print("-" * 49)
+    print(f"{'total':<30} {total * 1000:>8.1f}ms")
+
+    slowest = sorted(
+        bot.cog_load_report.items(),
+        key=lambda item: item[1]["import"] + item[1]["setup"],
+        reverse=True,
+    )[:SLOWEST_COGS]
+
+    if slowest:
+        print()
+        print("Slowest cogs:")
+        for cog_name, entry in slowest:
+            print(
+                f"  {cog_name:<40} import {entry['import'] * 1000:7.1f}ms  setup {entry['setup'] * 1000:7.1f}ms"
+            )
+    print()
+
+
+if __name__ == "__main__":
+    # Same working directory as app.py, the config files are relative to it
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    asyncio.run(profile(connect_gateway="--no-gateway" not in sys.argv))